@@ -1,11 +1,16 @@
 import asyncio
 import logging
+import math
 
-from quart import Quart
+from quart import Quart, request
 from quart_schema import QuartSchema, ResponseSchemaValidationError, hide
 
 from app_init.app_init import BeanFactory
+from common.config.config import CYODA_REQUEST_DEADLINE, CYODA_REQUEST_DEADLINE_MAX
 from common.exception.exception_handler import register_error_handlers
+from common.transport import deadline
+from common.transport.http_client import http_client
+from common.utils.utils import cyoda_transport_stats
 # Import blueprints for different route groups
 from routes.routes import routes_bp
 
@@ -14,6 +19,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 factory = BeanFactory(config={"CHAT_REPOSITORY": "cyoda"})
 grpc_client = factory.get_services()["grpc_client"]
+entity_service = factory.get_services()["entity_service"]
 
 app = Quart(__name__)
 
@@ -42,17 +48,55 @@ register_error_handlers(app)
 @hide
 def favicon():
     return "", 200
-# Startup tasks: initialize Cyoda and start the GRPC stream in the background
+
+
+# Operational metrics of the outbound Cyoda transport and of the entity service
+@app.route("/metrics")
+@hide
+async def metrics():
+    return {"transport": cyoda_transport_stats(), "entity_service": entity_service.stats()}, 200
+
+
+# Startup tasks: open the HTTP connection pool and start the GRPC stream in the background
 @app.before_serving
 async def startup():
+    await http_client.start()
     app.background_task = asyncio.create_task(grpc_client.grpc_stream())
 
 
-# Shutdown tasks: cancel the background task when shutting down
+# Shutdown tasks: cancel the background task and close the HTTP connection pool
 @app.after_serving
 async def shutdown():
     app.background_task.cancel()
-    await app.background_task
+    try:
+        await app.background_task
+    finally:
+        await http_client.close()
+
+
+# Shortest deadline an X-Request-Timeout header may ask for (seconds)
+_MIN_REQUEST_DEADLINE = 0.1
+
+
+# Every outbound Cyoda call made while handling a request shares the request's deadline.
+# A client may set it with an X-Request-Timeout header (seconds), clamped to
+# [_MIN_REQUEST_DEADLINE, CYODA_REQUEST_DEADLINE_MAX], e.g. to give a large bulk write
+# more time; a value that is not a positive number is ignored. If the client
+# disconnects, Quart cancels the handler and with it any outbound call in progress.
+@app.before_request
+async def set_request_deadline():
+    timeout = CYODA_REQUEST_DEADLINE
+    header = request.headers.get("X-Request-Timeout")
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = math.nan
+        if math.isfinite(requested) and requested > 0:
+            timeout = max(_MIN_REQUEST_DEADLINE, min(requested, CYODA_REQUEST_DEADLINE_MAX))
+        else:
+            logger.warning(f"Ignoring invalid X-Request-Timeout header: {header}")
+    deadline.set_deadline(timeout)
 
 
 # Middleware to add CORS headers to every response
@@ -0,0 +1,96 @@
+"""
+Throughput of the pooled Cyoda transport over HTTP/1.1 vs HTTP/2 as concurrency grows.
+
+Runs against the local stand-in server, so no Cyoda environment is needed:
+
+    python -m benchmarks.http2_transport --latency-ms 20 --max-connections 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# The transport reads its defaults from common.config, which requires these
+os.environ.setdefault("CYODA_HOST", "localhost")
+os.environ.setdefault("CYODA_CLIENT_ID", "benchmark")
+os.environ.setdefault("CYODA_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("CHAT_ID", "benchmark")
+os.environ.setdefault("ENTITY_VERSION", "1")
+
+from benchmarks.stand_in_server import start_stand_in_server  # noqa: E402
+from common.transport.http_client import PooledHttpClient  # noqa: E402
+
+CONCURRENCY_LEVELS = [1, 8, 32, 128, 256]
+
+
+async def _run_level(client: PooledHttpClient, base_url: str, concurrency: int, requests_per_worker: int):
+    latencies = []
+
+    async def worker(worker_id: int):
+        for i in range(requests_per_worker):
+            path = "search/snapshot/s-%d/status" % worker_id if i % 2 else "entity/e-%d-%d" % (worker_id, i)
+            started = time.perf_counter()
+            response = await client.request("GET", f"{base_url}/{path}")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def _run_mode(name: str, http2: bool, base_url: str, args) -> list:
+    client = PooledHttpClient(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+        max_connections_per_host=10_000,
+        http2=http2,
+        # The stand-in server is cleartext, so HTTP/2 has to use prior knowledge
+        http1=not http2,
+    )
+    await client.start()
+    try:
+        # Warm the pool so handshakes are not part of the measurement
+        await _run_level(client, base_url, args.max_connections, 2)
+        rows = []
+        for concurrency in CONCURRENCY_LEVELS:
+            requests_per_worker = max(args.requests // concurrency, 2)
+            result = await _run_level(client, base_url, concurrency, requests_per_worker)
+            rows.append((name, concurrency, result))
+        return rows
+    finally:
+        await client.close()
+
+
+async def main(args) -> None:
+    base_url = f"http://127.0.0.1:{args.port}/api"
+    rows = []
+    rows += await _run_mode("HTTP/1.1", False, base_url, args)
+    rows += await _run_mode("HTTP/2", True, base_url, args)
+
+    print(f"\nstand-in latency={args.latency_ms}ms, max_connections={args.max_connections}\n")
+    print(f"{'protocol':<10}{'concurrency':>12}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, concurrency, result in rows:
+        print(f"{name:<10}{concurrency:>12}{result['rps']:>12.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-connections", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000, help="approximate requests per concurrency level")
+    arguments = parser.parse_args()
+
+    server = start_stand_in_server(port=arguments.port, latency_ms=arguments.latency_ms)
+    try:
+        asyncio.run(main(arguments))
+    finally:
+        server.terminate()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark of the JSON codec against the stdlib json module on payloads
+shaped like the ones the client actually moves.
+
+    python -m benchmarks.json_codec
+    CYODA_JSON_CODEC=json python -m benchmarks.json_codec   # force the stdlib backend
+"""
+import argparse
+import copy
+import json
+import os
+import timeit
+import uuid
+
+# The codec reads its backend from common.config, which requires these
+os.environ.setdefault("CYODA_HOST", "localhost")
+os.environ.setdefault("CYODA_CLIENT_ID", "benchmark")
+os.environ.setdefault("CYODA_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("CHAT_ID", "benchmark")
+os.environ.setdefault("ENTITY_VERSION", "1")
+
+from common.utils import json_codec  # noqa: E402
+
+# Calculation request as received over gRPC (the sample documented in entity/workflow.py)
+CALC_REQUEST = {
+    'entityId': 'ee965a32-4df6-11b2-b48d-f20bdf753a91', 'id': 'e37b9e72-c7b4-4ed3-9fa7-85ab6d85e4b1',
+    'payload': {'data': {
+        'data_source': {'data_retrieval_method': 'GET', 'source_name': 'External API',
+                        'source_url': 'https://api.example.com/data'},
+        'job_id': 'job_001', 'job_name': 'Data Processing Job',
+        'recipients': [{'email': 'admin@example.com', 'name': 'Admin User'},
+                       {'email': 'analyst@example.com', 'name': 'Data Analyst'}],
+        'report': {'distribution_info': {'communication_method': 'Email', 'sent_at': '2023-10-01T17:40:00Z'},
+                   'generated_at': '2023-10-01T17:35:00Z', 'report_id': 'report_001',
+                   'report_title': 'Monthly Data Processing Report'},
+        'request_parameters': {'code': '7080005051286', 'country': 'FI', 'name': ''}},
+        'type': 'TREE'},
+    'processorId': '1fbb8b6e-c2c7-11ef-a99c-ce3d8f1a57a3', 'processorName': 'ingest_raw_data',
+    'requestId': 'e37b9e72-c7b4-4ed3-9fa7-85ab6d85e4b1', 'success': True,
+    'transactionId': 'bb537de0-c2f2-11ef-b48d-f20bdf753a91', 'warnings': [],
+}
+
+
+def _entity(i: int) -> dict:
+    entity = copy.deepcopy(CALC_REQUEST['payload']['data'])
+    entity['job_id'] = f"job_{i:06d}"
+    entity['metrics'] = {'price': 1371200.5 + i, 'square_meters': 168 + i % 40, 'ratio': i / 7}
+    return entity
+
+
+def _tree_entity(children: int) -> dict:
+    # A few hundred KB of nested nodes, like the large tree entities sent by save/update
+    return {
+        'root': _entity(0),
+        'nodes': [{'id': str(uuid.UUID(int=i)), 'entity': _entity(i), 'children': [_entity(i + j) for j in range(3)]}
+                  for i in range(children)],
+    }
+
+
+def _snapshot_page(size: int) -> dict:
+    return {
+        '_embedded': {'objectNodes': [{'data': _entity(i), 'meta': {'id': str(uuid.UUID(int=i))}}
+                                      for i in range(size)]},
+        'page': {'number': 0, 'size': size, 'totalElements': size, 'totalPages': 1},
+    }
+
+
+PAYLOADS = {
+    'calc_request': CALC_REQUEST,
+    'entity_list_1k': [_entity(i) for i in range(1000)],
+    'snapshot_page_500': _snapshot_page(500),
+    'tree_entity': _tree_entity(100),
+}
+
+
+def _best_per_op(fn, repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(repeat: int) -> None:
+    print(f"\ncodec backend: {json_codec.BACKEND}\n")
+    print(f"{'payload':<20}{'size KB':>9}{'op':>8}{'stdlib us':>12}{'codec us':>12}{'speedup':>9}")
+    for name, payload in PAYLOADS.items():
+        encoded = json.dumps(payload).encode("utf-8")
+        assert json_codec.loads(json_codec.dumps_bytes(payload)) == json.loads(encoded)
+        cases = [
+            ('dumps', lambda: json.dumps(payload).encode("utf-8"), lambda: json_codec.dumps_bytes(payload)),
+            ('loads', lambda: json.loads(encoded), lambda: json_codec.loads(encoded)),
+        ]
+        for op, stdlib_fn, codec_fn in cases:
+            stdlib_time = _best_per_op(stdlib_fn, repeat)
+            codec_time = _best_per_op(codec_fn, repeat)
+            print(f"{name:<20}{len(encoded) / 1024:>9.1f}{op:>8}{stdlib_time * 1e6:>12.1f}"
+                  f"{codec_time * 1e6:>12.1f}{stdlib_time / codec_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args().repeat)
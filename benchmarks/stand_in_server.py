@@ -0,0 +1,55 @@
+"""
+Minimal local stand-in for the Cyoda REST API, used by the benchmarks.
+
+Serves the handful of endpoints the repository hot paths hit with a fixed
+artificial latency, over HTTP/1.1 and cleartext HTTP/2 (prior knowledge).
+"""
+import asyncio
+import multiprocessing
+import time
+
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from quart import Quart, jsonify
+
+
+def create_app(latency_ms: float) -> Quart:
+    app = Quart(__name__)
+    delay = latency_ms / 1000.0
+
+    @app.route("/api/entity/<technical_id>")
+    async def get_entity(technical_id):
+        await asyncio.sleep(delay)
+        return jsonify({"data": {"id": technical_id, "name": "stand-in"}, "meta": {"state": "VALIDATED"}})
+
+    @app.route("/api/search/snapshot/<snapshot_id>/status")
+    async def get_snapshot_status(snapshot_id):
+        await asyncio.sleep(delay)
+        return jsonify({"snapshotStatus": "SUCCESSFUL"})
+
+    return app
+
+
+def _run(host: str, port: int, latency_ms: float) -> None:
+    config = Config()
+    config.bind = [f"{host}:{port}"]
+    config.loglevel = "WARNING"
+    config.accesslog = None
+    config.keep_alive_max_requests = 1_000_000
+    asyncio.run(_serve_forever(create_app(latency_ms), config))
+
+
+async def _serve_forever(app: Quart, config: Config) -> None:
+    # An explicit shutdown trigger stops Hypercorn installing its own signal
+    # handlers, so the parent can simply terminate the process
+    await serve(app, config, shutdown_trigger=asyncio.Event().wait)
+
+
+def start_stand_in_server(host: str = "127.0.0.1", port: int = 8765, latency_ms: float = 20.0):
+    """
+    Start the stand-in server in a child process and return the process handle.
+    """
+    process = multiprocessing.Process(target=_run, args=(host, port, latency_ms), daemon=True)
+    process.start()
+    time.sleep(1.5)
+    return process
@@ -18,4 +18,100 @@ GRPC_ADDRESS = os.getenv("GRPC_ADDRESS", f"grpc-{CYODA_HOST}")
 PROJECT_DIR = os.getenv("PROJECT_DIR", "/tmp")
 CYODA_ENTITY_TYPE_EDGE_MESSAGE = "EDGE_MESSAGE"
 CHAT_REPOSITORY = os.getenv("CHAT_REPOSITORY", "cyoda")
-IMPORT_WORKFLOWS = bool(os.getenv("IMPORT_WORKFLOWS", "false"))
\ No newline at end of file
+IMPORT_WORKFLOWS = bool(os.getenv("IMPORT_WORKFLOWS", "false"))
+
+# Outbound HTTP connection pool
+CYODA_HTTP_TIMEOUT = float(os.getenv("CYODA_HTTP_TIMEOUT", "150.0"))
+CYODA_HTTP_MAX_CONNECTIONS = int(os.getenv("CYODA_HTTP_MAX_CONNECTIONS", "100"))
+CYODA_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CYODA_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+CYODA_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("CYODA_HTTP_KEEPALIVE_EXPIRY", "30.0"))
+CYODA_HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("CYODA_HTTP_MAX_CONNECTIONS_PER_HOST", "50"))
+CYODA_HTTP2 = os.getenv("CYODA_HTTP2", "false").lower() == "true"
+CYODA_COALESCE_GETS = os.getenv("CYODA_COALESCE_GETS", "true").lower() == "true"
+# none | gzip | zstd; bodies smaller than CYODA_HTTP_COMPRESSION_MIN_BYTES are never compressed
+CYODA_HTTP_REQUEST_COMPRESSION = os.getenv("CYODA_HTTP_REQUEST_COMPRESSION", "none")
+CYODA_HTTP_COMPRESSION_MIN_BYTES = int(os.getenv("CYODA_HTTP_COMPRESSION_MIN_BYTES", "16384"))
+# auto | orjson | json
+CYODA_JSON_CODEC = os.getenv("CYODA_JSON_CODEC", "auto")
+
+# Retries and circuit breaking for Cyoda REST calls
+CYODA_MAX_RETRIES = int(os.getenv("CYODA_MAX_RETRIES", "3"))
+CYODA_RETRY_BASE_DELAY = float(os.getenv("CYODA_RETRY_BASE_DELAY", "0.2"))
+CYODA_RETRY_MAX_DELAY = float(os.getenv("CYODA_RETRY_MAX_DELAY", "10.0"))
+CYODA_RETRY_BUDGET_RATIO = float(os.getenv("CYODA_RETRY_BUDGET_RATIO", "0.2"))
+CYODA_RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("CYODA_RETRY_BUDGET_MIN_PER_SECOND", "5"))
+CYODA_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CYODA_BREAKER_FAILURE_THRESHOLD", "5"))
+CYODA_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("CYODA_BREAKER_RECOVERY_TIMEOUT", "30.0"))
+
+# Outbound concurrency per lane (bulkhead)
+CYODA_BULKHEAD_INTERACTIVE = int(os.getenv("CYODA_BULKHEAD_INTERACTIVE", "32"))
+CYODA_BULKHEAD_BULK = int(os.getenv("CYODA_BULKHEAD_BULK", "8"))
+CYODA_BULKHEAD_PROCESSOR = int(os.getenv("CYODA_BULKHEAD_PROCESSOR", "8"))
+
+# Deadlines: incoming requests (an X-Request-Timeout header may set another, up to the max) and gRPC calc requests
+CYODA_REQUEST_DEADLINE = float(os.getenv("CYODA_REQUEST_DEADLINE", "150.0"))
+CYODA_REQUEST_DEADLINE_MAX = float(os.getenv("CYODA_REQUEST_DEADLINE_MAX", "600.0"))
+# Must match the calculation_response_timeout_ms that workflows give Cyoda (workflow_enricher)
+GRPC_CALC_RESPONSE_TIMEOUT_MS = int(os.getenv("GRPC_CALC_RESPONSE_TIMEOUT_MS", "120000"))
+
+# Hedged requests for idempotent reads
+CYODA_HEDGING = os.getenv("CYODA_HEDGING", "false").lower() == "true"
+CYODA_HEDGE_PERCENTILE = float(os.getenv("CYODA_HEDGE_PERCENTILE", "95"))
+CYODA_HEDGE_MIN_DELAY = float(os.getenv("CYODA_HEDGE_MIN_DELAY", "0.02"))
+CYODA_HEDGE_BUDGET_RATIO = float(os.getenv("CYODA_HEDGE_BUDGET_RATIO", "0.1"))
+
+# Adaptive (AIMD) concurrency limit for all Cyoda REST calls
+CYODA_ADAPTIVE_CONCURRENCY = os.getenv("CYODA_ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+CYODA_ADAPTIVE_INITIAL_LIMIT = int(os.getenv("CYODA_ADAPTIVE_INITIAL_LIMIT", "32"))
+CYODA_ADAPTIVE_MIN_LIMIT = int(os.getenv("CYODA_ADAPTIVE_MIN_LIMIT", "4"))
+CYODA_ADAPTIVE_MAX_LIMIT = int(os.getenv("CYODA_ADAPTIVE_MAX_LIMIT", "200"))
+CYODA_ADAPTIVE_BACKOFF_RATIO = float(os.getenv("CYODA_ADAPTIVE_BACKOFF_RATIO", "0.7"))
+CYODA_ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv("CYODA_ADAPTIVE_LATENCY_TOLERANCE", "2.0"))
+
+# Snapshot search results are fetched this many entities per page
+CYODA_SEARCH_PAGE_SIZE = int(os.getenv("CYODA_SEARCH_PAGE_SIZE", "1000"))
+
+# Shared snapshot status poller
+CYODA_SNAPSHOT_POLL_MIN_INTERVAL = float(os.getenv("CYODA_SNAPSHOT_POLL_MIN_INTERVAL", "0.05"))
+CYODA_SNAPSHOT_POLL_MAX_INTERVAL = float(os.getenv("CYODA_SNAPSHOT_POLL_MAX_INTERVAL", "2.0"))
+CYODA_SNAPSHOT_POLL_CONCURRENCY = int(os.getenv("CYODA_SNAPSHOT_POLL_CONCURRENCY", "16"))
+
+# Cache of find_all_by_criteria results, invalidated by writes through this app (0 disables)
+CYODA_QUERY_CACHE_TTL = float(os.getenv("CYODA_QUERY_CACHE_TTL", "0"))
+CYODA_QUERY_CACHE_MAX_ENTRIES = int(os.getenv("CYODA_QUERY_CACHE_MAX_ENTRIES", "256"))
+# Identical concurrent searches share one snapshot, independently of the TTL and of CYODA_COALESCE_GETS
+CYODA_QUERY_CACHE_SHARE_IN_FLIGHT = os.getenv("CYODA_QUERY_CACHE_SHARE_IN_FLIGHT", "true").lower() == "true"
+
+# Keys per OR search when looking up entities by a list of keys
+CYODA_KEY_LOOKUP_CHUNK_SIZE = int(os.getenv("CYODA_KEY_LOOKUP_CHUNK_SIZE", "100"))
+
+# Snapshots kept for cursor pagination (get_items_page)
+CYODA_SNAPSHOT_HANDLE_TTL = float(os.getenv("CYODA_SNAPSHOT_HANDLE_TTL", "600"))
+CYODA_SNAPSHOT_HANDLE_MAX_ENTRIES = int(os.getenv("CYODA_SNAPSHOT_HANDLE_MAX_ENTRIES", "1000"))
+
+# Bloom filter of entity keys per model, answering "definitely absent" key lookups locally.
+# Opt-in: the filter is per process, so with several replicas writing the same model a key
+# saved by another replica may be reported absent until the next rebuild (CYODA_KEY_BLOOM_TTL).
+# Enable it only where one process writes the model, or where that staleness is acceptable.
+CYODA_KEY_BLOOM_FILTER = os.getenv("CYODA_KEY_BLOOM_FILTER", "false").lower() == "true"
+CYODA_KEY_BLOOM_FALSE_POSITIVE_RATE = float(os.getenv("CYODA_KEY_BLOOM_FALSE_POSITIVE_RATE", "0.01"))
+CYODA_KEY_BLOOM_CAPACITY = int(os.getenv("CYODA_KEY_BLOOM_CAPACITY", "100000"))
+CYODA_KEY_BLOOM_MAX_BYTES = int(os.getenv("CYODA_KEY_BLOOM_MAX_BYTES", str(16 * 1024 * 1024)))
+CYODA_KEY_BLOOM_TTL = float(os.getenv("CYODA_KEY_BLOOM_TTL", "300"))
+
+# Concurrent deletes in bulk delete (further bounded by the bulk lane)
+CYODA_BULK_DELETE_CONCURRENCY = int(os.getenv("CYODA_BULK_DELETE_CONCURRENCY", "16"))
+
+# Bulk writes (save_all) are split into chunks bounded by entity count and encoded size
+CYODA_BULK_CHUNK_SIZE = int(os.getenv("CYODA_BULK_CHUNK_SIZE", "1000"))
+CYODA_BULK_CHUNK_MAX_BYTES = int(os.getenv("CYODA_BULK_CHUNK_MAX_BYTES", str(4 * 1024 * 1024)))
+CYODA_BULK_WRITE_CONCURRENCY = int(os.getenv("CYODA_BULK_WRITE_CONCURRENCY", "4"))
+
+# Opt-in micro-batching of add_item calls into bulk saves
+CYODA_WRITE_BATCHING = os.getenv("CYODA_WRITE_BATCHING", "false").lower() == "true"
+CYODA_WRITE_BATCH_WINDOW = float(os.getenv("CYODA_WRITE_BATCH_WINDOW", "0.005"))
+CYODA_WRITE_BATCH_MAX_ITEMS = int(os.getenv("CYODA_WRITE_BATCH_MAX_ITEMS", "100"))
+
+# Opt-in last-write-wins coalescing of repeated updates to the same entity and transition
+CYODA_UPDATE_COALESCING = os.getenv("CYODA_UPDATE_COALESCING", "false").lower() == "true"
+CYODA_UPDATE_COALESCE_WINDOW = float(os.getenv("CYODA_UPDATE_COALESCE_WINDOW", "0.05"))
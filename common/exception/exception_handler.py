@@ -2,7 +2,8 @@
 import logging
 from quart import jsonify
 
-from common.exception.exceptions import UnauthorizedAccessException, ChatNotFoundException
+from common.exception.exceptions import UnauthorizedAccessException, ChatNotFoundException, CircuitOpenException, \
+    DeadlineExceededException, InvalidCursorException, BulkWriteException
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,22 @@ def register_error_handlers(app):
     async def handle_chat_not_found_exception(error):
         return jsonify({"error": str(error)}), 404
 
+    @app.errorhandler(CircuitOpenException)
+    async def handle_circuit_open_exception(error):
+        return jsonify({"error": str(error)}), 503
+
+    @app.errorhandler(DeadlineExceededException)
+    async def handle_deadline_exceeded_exception(error):
+        return jsonify({"error": str(error)}), 504
+
+    @app.errorhandler(InvalidCursorException)
+    async def handle_invalid_cursor_exception(error):
+        return jsonify({"error": str(error)}), 400
+
+    @app.errorhandler(BulkWriteException)
+    async def handle_bulk_write_exception(error):
+        return jsonify({"error": str(error), "failures": error.failures}), 502
+
     @app.errorhandler(Exception)
     async def handle_any_exception(error):
         logger.exception(error)
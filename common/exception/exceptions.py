@@ -15,4 +15,35 @@ class ForbiddenAccessException(Exception):
     def __init__(self, message="Forbidden access"):
         self.message = message
         self.status_code = 403
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class CircuitOpenException(Exception):
+    def __init__(self, message="Service temporarily unavailable"):
+        self.message = message
+        self.status_code = 503
+        super().__init__(self.message)
+
+class DeadlineExceededException(Exception):
+    def __init__(self, message="Request deadline exceeded"):
+        self.message = message
+        self.status_code = 504
+        super().__init__(self.message)
+
+class InvalidCursorException(Exception):
+    def __init__(self, message="Invalid or mismatched page cursor"):
+        self.message = message
+        self.status_code = 400
+        super().__init__(self.message)
+
+class BulkWriteException(Exception):
+    """
+    Some chunks of a bulk write failed. results holds the outcome per input
+    position (None where its chunk failed); failures describes each failed
+    chunk: {"start", "size", "error"}.
+    """
+    def __init__(self, message="Bulk write partially failed", results=None, failures=None):
+        self.message = message
+        self.status_code = 502
+        self.results = results or []
+        self.failures = failures or []
+        super().__init__(self.message)
@@ -1,6 +1,5 @@
 import logging
 import uuid
-import json
 import asyncio
 from xml.dom import InvalidStateErr
 
@@ -8,7 +7,11 @@ import grpc
 
 from cloudevents_pb2 import CloudEvent
 from common.config import config
-from common.config.config import GRPC_PROCESSOR_TAG
+from common.config.config import GRPC_PROCESSOR_TAG, GRPC_CALC_RESPONSE_TIMEOUT_MS
+from common.exception.exceptions import DeadlineExceededException
+from common.transport.bulkhead import outbound_lane, PROCESSOR_LANE
+from common.transport.deadline import deadline_scope
+from common.utils import json_codec
 from cyoda_cloud_api_pb2_grpc import CloudEventsServiceStub
 from entity.workflow import process_dispatch, process_event
 
@@ -62,7 +65,7 @@ class GrpcClient:
             source=source,
             spec_version=SPEC_VERSION,
             type=event_type,
-            text_data=json.dumps(data),
+            text_data=json_codec.dumps(data),
         )
 
     def create_join_event(self) -> CloudEvent:
@@ -73,7 +76,7 @@ class GrpcClient:
             data={"owner": OWNER, "tags": TAGS},
         )
 
-    def create_notification_event(self, data: dict, type: str, response=None) -> CloudEvent:
+    def create_notification_event(self, data: dict, type: str, response=None, success: bool = True) -> CloudEvent:
         if type == CALC_REQ_EVENT_TYPE:
             return self.create_cloud_event(
                 event_id=str(uuid.uuid4()),
@@ -84,7 +87,7 @@ class GrpcClient:
                     "entityId": data.get('entityId'),
                     "owner": OWNER,
                     "payload": data.get('payload'),
-                    "success": True
+                    "success": success
                 }
             )
         elif type == CRITERIA_CALC_REQ_EVENT_TYPE:
@@ -97,7 +100,7 @@ class GrpcClient:
                     "entityId": data.get('entityId'),
                     "owner": OWNER,
                     "matches": response,
-                    "success": True
+                    "success": success
                 }
             )
         else:
@@ -113,7 +116,7 @@ class GrpcClient:
             queue.task_done()
 
     async def handle_keep_alive_event(self, response, queue: asyncio.Queue):
-        data = json.loads(response.text_data)
+        data = json_codec.loads(response.text_data)
         ack = self.create_cloud_event(
             event_id=str(uuid.uuid4()),
             source=SOURCE,
@@ -134,16 +137,26 @@ class GrpcClient:
             processor_name = data['criteriaName']
         else:
             raise ValueError(f"Unsupported event type: {type}")
+        success = True
         try:
             # Process the first or subsequent versions of the entity
             if processor_name in process_dispatch:
                 logger.debug(f"Processing notification entity: {data}")
-                await process_event(data=data, processor_name=processor_name)
-
+                # Cyoda stops waiting for the response after the calculation timeout,
+                # so nothing needs the work (or its outbound calls) beyond that point
+                timeout = GRPC_CALC_RESPONSE_TIMEOUT_MS / 1000.0
+                with outbound_lane(PROCESSOR_LANE), deadline_scope(timeout):
+                    async with asyncio.timeout(timeout):
+                        await process_event(data=data, processor_name=processor_name)
+
+        except (TimeoutError, DeadlineExceededException):
+            # The processor was cut off part-way; its payload must not be reported as the result
+            logger.error(f"Processor {processor_name} timed out for request {data.get('requestId')}")
+            success = False
         except Exception as e:
             logger.error(e)
         #Create notification event and put it in the queue
-        notification_event = self.create_notification_event(data=data, type=type)
+        notification_event = self.create_notification_event(data=data, type=type, success=success)
         await queue.put(notification_event)
 
     async def consume_stream(self):
@@ -164,7 +177,7 @@ class GrpcClient:
                             logger.debug(response)
                         elif response.type in (CALC_REQ_EVENT_TYPE, CRITERIA_CALC_REQ_EVENT_TYPE):
                             logger.info(f"Calc request: {response.type}")
-                            data = json.loads(response.text_data)
+                            data = json_codec.loads(response.text_data)
                             asyncio.create_task(self.process_calc_req_event(data, queue, response.type))
                         elif response.type == GREET_EVENT_TYPE:
                             logger.info("Greet event received")
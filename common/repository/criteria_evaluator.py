@@ -0,0 +1,277 @@
+"""
+Local evaluation of Cyoda search conditions, for repositories that keep
+entities in process (InMemoryRepository).
+
+Understands the condition shapes used in this code base:
+
+- search conditions: {"type": "group", "operator": "AND", "conditions": [...]}
+  with {"type": "simple", "jsonPath": "$.name", "operatorType": "EQUALS", "value": ...} leaves,
+  as built by common.repository.cyoda.util.query_builder;
+- the "@bean" conditions produced by workflow_to_dto_converter._transform_condition
+  (GroupCondition with "operation"/"fieldName" leaves);
+- the legacy {"key": ..., "value": ...} equality shape.
+
+Each distinct condition is compiled once into a predicate closure and reused.
+"""
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Callable, List
+
+Predicate = Callable[[Any], bool]
+
+_MISSING = object()
+# fieldName of a non-meta field: members.[*]@...PersistedValueMaps.<type>.[$.field]
+_TREE_FIELD = re.compile(r"\.\[(\$[^\]]*)\]$")
+_MAX_COMPILED = 512
+_compiled: "OrderedDict[str, Predicate]" = OrderedDict()
+
+
+def compile_criteria(criteria: Any) -> Predicate:
+    """
+    Predicate for the criteria, memoised by the criteria's content.
+    """
+    if hasattr(criteria, "build"):
+        criteria = criteria.build()
+    if hasattr(criteria, "to_dict"):
+        criteria = criteria.to_dict()
+    key = json.dumps(criteria, sort_keys=True, default=str)
+    predicate = _compiled.get(key)
+    if predicate is None:
+        predicate = _compile(criteria)
+        _compiled[key] = predicate
+        if len(_compiled) > _MAX_COMPILED:
+            _compiled.popitem(last=False)
+    else:
+        _compiled.move_to_end(key)
+    return predicate
+
+
+def _compile(condition: Any) -> Predicate:
+    if not condition:
+        return lambda entity: True
+    if "conditions" in condition:
+        return _compile_group(condition)
+    if "operatorType" in condition or "operation" in condition:
+        return _compile_leaf(condition)
+    if "key" in condition:
+        return _compile_leaf({"jsonPath": condition["key"], "operatorType": "EQUALS", "value": condition.get("value")})
+    raise ValueError(f"Unsupported search condition: {condition}")
+
+
+def _compile_group(condition: dict) -> Predicate:
+    operator = (condition.get("operator") or condition.get("group_condition_operator") or "AND").upper()
+    predicates = [_compile(sub_condition) for sub_condition in condition["conditions"]]
+    if operator == "AND":
+        return lambda entity: all(predicate(entity) for predicate in predicates)
+    if operator == "OR":
+        return lambda entity: any(predicate(entity) for predicate in predicates)
+    if operator == "NOT":
+        return lambda entity: not any(predicate(entity) for predicate in predicates)
+    raise ValueError(f"Unsupported group operator: {operator}")
+
+
+def _field_path(condition: dict) -> List[str]:
+    path = condition.get("jsonPath") or condition.get("fieldName") or ""
+    match = _TREE_FIELD.search(path)
+    if match:
+        path = match.group(1)
+    if path.startswith("$"):
+        path = path[1:]
+    return [part for part in re.split(r"\.|\[\*?\]", path) if part]
+
+
+def _compile_getter(parts: List[str]) -> Callable[[Any], List[Any]]:
+    """
+    Getter returning every value at the path; lists along the way are
+    searched element by element, so a condition matches if any element does.
+    """
+    def get(entity: Any) -> List[Any]:
+        # Fast path: plain nested objects, no lists on the way
+        value = entity
+        for part in parts:
+            if not isinstance(value, dict):
+                break
+            value = value.get(part, _MISSING)
+        else:
+            if value is _MISSING:
+                return []
+            return value if isinstance(value, list) else [value]
+        if value is _MISSING or not isinstance(value, list):
+            return []
+        return get_through_lists(entity)
+
+    def get_through_lists(entity: Any) -> List[Any]:
+        values = [entity]
+        for part in parts:
+            found = []
+            for value in values:
+                if isinstance(value, list):
+                    found.extend(item.get(part, _MISSING) for item in value if isinstance(item, dict))
+                elif isinstance(value, dict):
+                    found.append(value.get(part, _MISSING))
+            values = [value for value in found if value is not _MISSING]
+            if not values:
+                return []
+        flattened = []
+        for value in values:
+            if isinstance(value, list):
+                flattened.extend(value)
+            else:
+                flattened.append(value)
+        return flattened
+    return get
+
+
+def _as_number(value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _comparable(left: Any, right: Any):
+    """Coerce both sides to numbers when either is one, as Cyoda compares numeric fields numerically."""
+    if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+        return _as_number(left), _as_number(right)
+    return left, right
+
+
+def _compare(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def test(actual: Any, expected: Any) -> bool:
+        if actual is None:
+            return False
+        left, right = _comparable(actual, expected)
+        try:
+            return op(left, right)
+        except TypeError:
+            return False
+    return test
+
+
+def _text(test: Callable[[str, str], bool], ignore_case: bool) -> Callable[[Any, Any], bool]:
+    if ignore_case:
+        return lambda actual, expected: actual is not None and test(str(actual).lower(), str(expected).lower())
+    return lambda actual, expected: actual is not None and test(str(actual), str(expected))
+
+
+def _between(actual: Any, expected: Any) -> bool:
+    if actual is None:
+        return False
+    low, high = expected
+    left, low = _comparable(actual, low)
+    left, high = _comparable(actual, high)
+    try:
+        return low <= left <= high
+    except TypeError:
+        return False
+
+
+def _equals(actual: Any, expected: Any) -> bool:
+    left, right = _comparable(actual, expected)
+    return left == right
+
+
+_contains = lambda actual, expected: expected in actual
+_starts_with = lambda actual, expected: actual.startswith(expected)
+_ends_with = lambda actual, expected: actual.endswith(expected)
+
+# Tests on a single value; negated operations are derived below
+_TESTS = {
+    "EQUALS": _equals,
+    "IEQUALS": _text(lambda actual, expected: actual == expected, True),
+    "LESS_THAN": _compare(lambda left, right: left < right),
+    "GREATER_THAN": _compare(lambda left, right: left > right),
+    "LESS_OR_EQUAL": _compare(lambda left, right: left <= right),
+    "GREATER_OR_EQUAL": _compare(lambda left, right: left >= right),
+    "BETWEEN": _between,
+    "BETWEEN_INCLUSIVE": _between,
+    "CONTAINS": _text(_contains, False),
+    "ICONTAINS": _text(_contains, True),
+    "STARTS_WITH": _text(_starts_with, False),
+    "ISTARTS_WITH": _text(_starts_with, True),
+    "ENDS_WITH": _text(_ends_with, False),
+    "IENDS_WITH": _text(_ends_with, True),
+    "MATCHES_PATTERN": lambda actual, expected: actual is not None and re.fullmatch(expected, str(actual)) is not None,
+}
+_NEGATED = {
+    "NOT_EQUAL": "EQUALS",
+    "INOT_EQUAL": "IEQUALS",
+    "NOT_CONTAINS": "CONTAINS",
+    "INOT_CONTAINS": "ICONTAINS",
+    "NOT_STARTS_WITH": "STARTS_WITH",
+    "INOT_STARTS_WITH": "ISTARTS_WITH",
+    "NOT_ENDS_WITH": "ENDS_WITH",
+    "INOT_ENDS_WITH": "IENDS_WITH",
+}
+
+
+# Operation of each condition bean; the bean decides how Cyoda evaluates a condition,
+# whatever its "operation" says (e.g. "contains" is sent as CONTAINS with the IContains bean)
+_BEAN_OPERATIONS = {
+    "Equals": "EQUALS",
+    "IEquals": "IEQUALS",
+    "NotEquals": "NOT_EQUAL",
+    "INotEquals": "INOT_EQUAL",
+    "LessThan": "LESS_THAN",
+    "GreaterThan": "GREATER_THAN",
+    "LessThanEquals": "LESS_OR_EQUAL",
+    "GreaterThanEquals": "GREATER_OR_EQUAL",
+    "Between": "BETWEEN",
+    "BetweenInclusive": "BETWEEN_INCLUSIVE",
+    "Contains": "CONTAINS",
+    "IContains": "ICONTAINS",
+    "NotContains": "NOT_CONTAINS",
+    "INotContains": "INOT_CONTAINS",
+    "StartsWith": "STARTS_WITH",
+    "IStartsWith": "ISTARTS_WITH",
+    "NotStartsWith": "NOT_STARTS_WITH",
+    "INotStartsWith": "INOT_STARTS_WITH",
+    "EndsWith": "ENDS_WITH",
+    "IEndsWith": "IENDS_WITH",
+    "NotEndsWith": "NOT_ENDS_WITH",
+    "INotEndsWith": "INOT_ENDS_WITH",
+    "IsNull": "IS_NULL",
+    "NotNull": "NOT_NULL",
+}
+
+
+def _operation(condition: dict) -> str:
+    bean = condition.get("@bean")
+    if bean:
+        operation = _BEAN_OPERATIONS.get(bean.rsplit(".", 1)[-1])
+        if operation is not None:
+            return operation
+    return (condition.get("operatorType") or condition.get("operation")).upper()
+
+
+def _range_value(condition: dict) -> Any:
+    if "from" in condition or "to" in condition:
+        return condition.get("from"), condition.get("to")
+    value = condition.get("value")
+    if isinstance(value, dict):
+        return value.get("from"), value.get("to")
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return tuple(value)
+    raise ValueError(f"Range condition needs a from/to pair: {condition}")
+
+
+def _compile_leaf(condition: dict) -> Predicate:
+    operation = _operation(condition)
+    get = _compile_getter(_field_path(condition))
+
+    if operation == "IS_NULL":
+        return lambda entity: all(value is None for value in get(entity))
+    if operation == "NOT_NULL":
+        return lambda entity: any(value is not None for value in get(entity))
+
+    expected = _range_value(condition) if operation.startswith("BETWEEN") else condition.get("value")
+    if operation in _NEGATED:
+        test = _TESTS[_NEGATED[operation]]
+        return lambda entity: not any(test(value, expected) for value in get(entity))
+    test = _TESTS.get(operation)
+    if test is None:
+        raise ValueError(f"Unsupported operation: {operation}")
+    return lambda entity: any(test(value, expected) for value in get(entity))
@@ -1,7 +1,8 @@
 from abc import abstractmethod
 from enum import Enum
-from typing import List, Any, Optional
+from typing import List, Any, Optional, AsyncIterator, Callable, Dict, Tuple
 
+from common.exception.exceptions import InvalidCursorException
 from common.repository.repository import Repository
 
 
@@ -11,6 +12,9 @@ class DBKeys(Enum):
 class CrudRepository(Repository):
     """
     Abstract base class defining a repository interface for CRUD operations.
+
+    Reads honour meta["fields"]: a list of field paths ("name", "address.city")
+    to which returned entities are projected (see common.repository.projection).
     """
     @abstractmethod
     async def get_meta(self, *args, **kwargs):
@@ -23,6 +27,12 @@ class CrudRepository(Repository):
         """
         pass
 
+    async def count_by_criteria(self, meta, criteria: Any) -> int:
+        """
+        Returns the number of entities matching the criteria.
+        """
+        return len(await self.find_all_by_criteria(meta, criteria) or [])
+
     @abstractmethod
     async def delete_by_id(self, meta, id: Any) -> None:
         """
@@ -30,6 +40,22 @@ class CrudRepository(Repository):
         """
         pass
 
+    async def delete_by_ids(self, meta, technical_ids: List[Any],
+                            on_progress: Optional[Callable[[int, int], Any]] = None) -> Dict[Any, dict]:
+        """
+        Deletes many entities. Returns {technical_id: {"status": "deleted" | "failed", "error": ...}}.
+        """
+        outcomes = {}
+        for technical_id in technical_ids:
+            try:
+                await self.delete_by_id(meta, technical_id)
+                outcomes[technical_id] = {"status": "deleted"}
+            except Exception as e:
+                outcomes[technical_id] = {"status": "failed", "error": str(e)}
+            if on_progress is not None:
+                on_progress(len(outcomes), len(technical_ids))
+        return outcomes
+
     @abstractmethod
     async def delete(self, meta, entity: Any) -> None:
         """
@@ -86,6 +112,35 @@ class CrudRepository(Repository):
         """
         pass
 
+    async def find_by_keys(self, meta, keys: List[Any]) -> Tuple[Dict[Any, Any], List[Any]]:
+        """
+        Looks up many keys at once. Returns ({key: entity}, [keys that were not found]).
+        """
+        found = {}
+        for key in keys:
+            entity = await self.find_by_key(meta, key)
+            if entity is not None:
+                found[key] = entity
+        return found, [key for key in keys if key not in found]
+
+    async def find_page_by_criteria(self, meta, criteria: Any, cursor: Optional[str] = None,
+                                    page_size: int = 100) -> Tuple[List[Any], Optional[str], int]:
+        """
+        Returns one page of the entities matching the criteria, the cursor of the
+        next page (None on the last page) and the total number of matches.
+        Repositories without snapshots re-run the search and slice it.
+        """
+        entities = await self.find_all_by_criteria(meta, criteria) or []
+        offset = 0
+        if cursor:
+            try:
+                offset, page_size = (int(part) for part in cursor.split(":"))
+            except ValueError:
+                raise InvalidCursorException()
+        end = offset + page_size
+        next_cursor = f"{end}:{page_size}" if end < len(entities) else None
+        return entities[offset:end], next_cursor, len(entities)
+
     @abstractmethod
     async def find_by_key(self, meta, key: Any) -> Optional[Any]:
         """
@@ -107,6 +162,15 @@ class CrudRepository(Repository):
         """
         pass
 
+    async def iter_pages_by_criteria(self, meta, criteria: Any) -> AsyncIterator[List[Any]]:
+        """
+        Streams the entities matching the criteria page by page.
+        Repositories without paging return everything as a single page.
+        """
+        entities = await self.find_all_by_criteria(meta, criteria)
+        if entities:
+            yield entities
+
     @abstractmethod
     async def save(self, meta, entity: Any) -> Any:
         """
@@ -140,4 +204,10 @@ class CrudRepository(Repository):
         """
         Gets next transitions
         """
-        pass
\ No newline at end of file
+        pass
+
+    def stats(self) -> dict:
+        """
+        Operational metrics of the repository's caches and helpers (empty when it has none).
+        """
+        return {}
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from common.config.config import (
+    CYODA_BULK_CHUNK_SIZE,
+    CYODA_BULK_CHUNK_MAX_BYTES,
+    CYODA_BULK_WRITE_CONCURRENCY,
+)
+from common.exception.exceptions import BulkWriteException
+
+logger = logging.getLogger(__name__)
+
+# (position of the chunk's first item in the input, encoded items)
+Chunk = Tuple[int, List[bytes]]
+
+
+def chunk_encoded(items: List[bytes], max_count: int = CYODA_BULK_CHUNK_SIZE,
+                  max_bytes: int = CYODA_BULK_CHUNK_MAX_BYTES) -> List[Chunk]:
+    """
+    Split already encoded items into chunks of at most max_count items and
+    about max_bytes of JSON. An item larger than max_bytes gets a chunk of its own.
+    """
+    chunks: List[Chunk] = []
+    start, current, size = 0, [], 2
+    for position, item in enumerate(items):
+        if current and (len(current) >= max_count or size + len(item) + 1 > max_bytes):
+            chunks.append((start, current))
+            start, current, size = position, [], 2
+        current.append(item)
+        size += len(item) + 1
+    if current:
+        chunks.append((start, current))
+    return chunks
+
+
+def json_array(items: List[bytes]) -> bytes:
+    """JSON array of already encoded items."""
+    return b"[" + b",".join(items) + b"]"
+
+
+async def run_chunks(chunks: List[Chunk], total: int, send_chunk: Callable[[Chunk], Awaitable[List[Any]]],
+                     concurrency: int = CYODA_BULK_WRITE_CONCURRENCY, what: str = "Bulk write",
+                     on_progress: Optional[Callable[[int, int], Any]] = None) -> List[Any]:
+    """
+    Send chunks with up to `concurrency` requests in flight. send_chunk returns
+    one result per item of its chunk. Returns the results in input order, or
+    raises BulkWriteException naming every failed chunk, with the results of
+    the chunks that did succeed.
+    """
+    results: List[Any] = [None] * total
+    failures = []
+    pending = iter(chunks)
+    done = [0]
+
+    async def worker():
+        for chunk in pending:
+            start, items = chunk
+            try:
+                chunk_results = await send_chunk(chunk)
+                if len(chunk_results) != len(items):
+                    raise ValueError(f"expected {len(items)} results, got {len(chunk_results)}")
+                results[start:start + len(items)] = chunk_results
+            except Exception as e:
+                logger.warning(f"{what}: chunk at {start} ({len(items)} items) failed: {e}")
+                failures.append({"start": start, "size": len(items), "error": str(e) or type(e).__name__})
+            done[0] += len(items)
+            if on_progress is not None:
+                on_progress(done[0], total)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(chunks)))))
+    if failures:
+        failures.sort(key=lambda failure: failure["start"])
+        failed = sum(failure["size"] for failure in failures)
+        raise BulkWriteException(f"{what}: {failed} of {total} items failed in {len(failures)} chunks",
+                                 results=results, failures=failures)
+    return results
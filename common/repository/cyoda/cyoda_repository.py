@@ -1,15 +1,28 @@
 import threading
-import json
 import logging
-import time
 import asyncio
-from typing import List, Any, Optional
+import functools
+from typing import List, Any, Optional, AsyncIterator, Callable, Dict, Tuple
 
 from common.config.config import (
     CYODA_ENTITY_TYPE_EDGE_MESSAGE,
+    CYODA_SEARCH_PAGE_SIZE,
+    CYODA_KEY_LOOKUP_CHUNK_SIZE,
+    CYODA_BULK_DELETE_CONCURRENCY,
 )
 from common.config.conts import EDGE_MESSAGE_CLASS, TREE_NODE_ENTITY_CLASS, UPDATE_TRANSITION
 from common.repository.crud_repository import CrudRepository
+from common.repository.projection import project
+from common.exception.exceptions import InvalidCursorException
+from common.repository.cyoda.bulk import chunk_encoded, json_array, run_chunks
+from common.repository.cyoda.key_filter import KeyPresenceFilter
+from common.repository.cyoda.paging import PageCursor, SnapshotHandles, search_digest
+from common.repository.cyoda.query_cache import QueryCache, criteria_shape
+from common.repository.cyoda.snapshot_poller import SnapshotPoller
+from common.repository.cyoda.update_coalescer import UpdateCoalescer
+from common.repository.cyoda.util.query_builder import Query, CompiledQuery, any_of, field
+from common.transport.bulkhead import BULK_LANE, current_lane, outbound_lane
+from common.utils import json_codec
 from common.utils.utils import (
     custom_serializer,
     send_cyoda_request,
@@ -20,6 +33,84 @@ logger = logging.getLogger(__name__)
 # In-memory cache for edge-message entities
 _edge_messages_cache = {}
 
+# Search results per (model, version, criteria); dropped on writes to the model
+_query_cache = QueryCache()
+
+# Snapshots that page cursors handed out by find_page_by_criteria may still read
+_snapshot_handles = SnapshotHandles()
+
+# Keys known per model, so lookups of absent keys can skip the search
+_key_filter = KeyPresenceFilter()
+
+# Opt-in merging of rapid updates to the same entity (CYODA_UPDATE_COALESCING)
+_update_coalescer = UpdateCoalescer()
+
+# Search condition matching every entity of a model
+_ALL_ENTITIES = {"type": "group", "operator": "AND", "conditions": []}
+
+
+def _invalidates_queries(write):
+    """
+    Drop the cached search results of the written model once the write is done
+    (or has failed, as it may still have been applied).
+    """
+    @functools.wraps(write)
+    async def wrapper(self, meta, *args, **kwargs):
+        try:
+            return await write(self, meta, *args, **kwargs)
+        finally:
+            _query_cache.invalidate(meta.get("entity_model") if isinstance(meta, dict) else None)
+    return wrapper
+
+
+def _keys_condition(key_field: str, keys: List[Any]) -> CompiledQuery:
+    """OR group matching any of the keys on the key field."""
+    key = field(key_field)
+    return any_of(*(key.equals(value) for value in keys)).build()
+
+
+def _criteria_body(criteria: Any) -> bytes:
+    if isinstance(criteria, Query):
+        criteria = criteria.build()
+    if isinstance(criteria, CompiledQuery):
+        return criteria.to_bytes()
+    return json_codec.dumps_bytes(criteria)
+
+
+def _field_value(entity: Any, path: str) -> Any:
+    """Value of a dotted field path in an entity, None when absent."""
+    value = entity
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _page_entities(resp_json: dict, fields: Optional[List[str]]) -> List[Any]:
+    """Entities of a decoded snapshot page, projected to the given fields."""
+    entities = []
+    for node in resp_json.get("_embedded", {}).get("objectNodes", []):
+        tree = node.get("data", {})
+        if not tree.get("technical_id"):
+            tree["technical_id"] = node.get("meta", {}).get("id")
+        entities.append(project(tree, fields))
+    return entities
+
+
+def _key_filter_model(meta) -> Tuple:
+    return meta["entity_model"], str(meta["entity_version"]), meta.get("key_field", "key")
+
+
+def _record_keys(meta, entities: List[Any]) -> None:
+    """Tell the key filter about keys about to be written."""
+    if not _key_filter.enabled or "entity_model" not in meta:
+        return
+    key_field = meta.get("key_field", "key")
+    keys = [_field_value(entity if isinstance(entity, dict) else custom_serializer(entity), key_field)
+            for entity in entities]
+    _key_filter.add(_key_filter_model(meta), keys)
+
 
 class CyodaRepository(CrudRepository):
     """
@@ -35,6 +126,7 @@ class CyodaRepository(CrudRepository):
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
                 cls._instance._cyoda_auth_service = cyoda_auth_service
+                cls._instance._snapshot_poller = SnapshotPoller(cls._instance._check_snapshot_status)
         return cls._instance
 
 
@@ -42,26 +134,17 @@ class CyodaRepository(CrudRepository):
             self,
             snapshot_id: str,
             timeout: float = 60.0,
-            interval: float = 0.3
+            shape: Any = None,
     ) -> None:
         """
-        Poll the snapshot status endpoint until SUCCESSFUL or error/timeout.
+        Wait until the snapshot is SUCCESSFUL, raising on error/timeout.
+        Status checks for all pending searches are made by one shared poller.
         """
-        start = time.monotonic()
-        status_path = f"search/snapshot/{snapshot_id}/status"
-
-        while True:
-            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=status_path)
-            if resp.get("status") != 200:
-                return
-            status = resp.get("json", {}).get("snapshotStatus")
-            if status == "SUCCESSFUL":
-                return
-            if status not in ("RUNNING",):
-                raise Exception(f"Snapshot search failed: {resp.get('json')}")
-            if time.monotonic() - start > timeout:
-                raise TimeoutError(f"Timeout exceeded after {timeout} seconds")
-            await asyncio.sleep(interval)
+        await self._snapshot_poller.wait(snapshot_id, timeout, shape)
+
+    async def _check_snapshot_status(self, snapshot_id: str) -> dict:
+        return await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get",
+                                        path=f"search/snapshot/{snapshot_id}/status", hedge=True)
 
     async def delete(self, meta, entity: Any) -> None:
         pass
@@ -70,21 +153,42 @@ class CyodaRepository(CrudRepository):
         return {"token": token, "entity_model": entity_model, "entity_version": entity_version}
 
     async def count(self, meta) -> int:
-        items = await self.find_all(meta)
-        return len(items)
+        path = f"entity/stats/{meta['entity_model']}/{meta['entity_version']}"
+        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path)
+        stats = resp.get("json")
+        if resp.get("status") == 200 and isinstance(stats, dict) and "count" in stats:
+            return int(stats["count"])
+        # No stats for this model: count an unconditional search instead
+        return await self.count_by_criteria(meta, _ALL_ENTITIES)
 
+    async def count_by_criteria(self, meta, criteria: Any) -> int:
+        """
+        Count matching entities from the snapshot's page metadata, without fetching them.
+        """
+        snapshot_id = await self._create_snapshot(meta, criteria)
+        if snapshot_id is None:
+            return 0
+        resp_json = await self._get_snapshot_page(snapshot_id, 0, 1)
+        return int(resp_json.get("page", {}).get("totalElements", 0))
+
+    @_invalidates_queries
     async def delete_all(self, meta) -> None:
         path = f"entity/{meta['entity_model']}/{meta['entity_version']}"
         await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="delete", path=path)
 
     async def delete_all_entities(self, meta, entities: List[Any]) -> None:
-        for entity in entities:
-            technical_id = getattr(entity, 'technical_id', entity)
-            await self.delete_by_id(meta, technical_id)
+        technical_ids = [entity.get('technical_id') if isinstance(entity, dict) else getattr(entity, 'technical_id', entity)
+                         for entity in entities]
+        await self.delete_by_ids(meta, technical_ids)
 
     async def delete_all_by_key(self, meta, keys: List[Any]) -> None:
-        for key in keys:
-            await self.delete_by_key(meta, key)
+        if meta.get("condition"):
+            for key in keys:
+                await self.delete_by_key(meta, key)
+            return
+        found, _ = await self.find_by_keys(meta, keys)
+        await self.delete_by_ids(meta, [entity["technical_id"] for entity in found.values()
+                                        if entity.get("technical_id")])
 
     async def delete_by_key(self, meta, key: Any) -> None:
         entity = await self.find_by_key(meta, key)
@@ -92,7 +196,10 @@ class CyodaRepository(CrudRepository):
             await self.delete_by_id(meta, entity['technical_id'])
 
     async def exists_by_key(self, meta, key: Any) -> bool:
-        return (await self.find_by_key(meta, key)) is not None
+        if meta.get("condition"):
+            return (await self.find_by_key(meta, key)) is not None
+        found, _ = await self.find_by_keys(meta, [key])
+        return bool(found)
 
     async def find_all(self, meta) -> List[Any]:
         path = f"entity/{meta['entity_model']}/{meta['entity_version']}"
@@ -100,16 +207,61 @@ class CyodaRepository(CrudRepository):
         return resp.get("json", [])
 
     async def find_all_by_key(self, meta, keys: List[Any]) -> List[Any]:
-        results = []
-        for key in keys:
-            entity = await self.find_by_key(meta, key)
-            if entity:
-                results.append(entity)
-        return results
+        if meta.get("condition"):
+            results = []
+            for key in keys:
+                entity = await self.find_by_key(meta, key)
+                if entity:
+                    results.append(entity)
+            return results
+        found, _ = await self.find_by_keys(meta, keys)
+        return [found[key] for key in keys if key in found]
+
+    async def find_by_keys(self, meta, keys: List[Any],
+                           chunk_size: int = CYODA_KEY_LOOKUP_CHUNK_SIZE) -> Tuple[Dict[Any, Any], List[Any]]:
+        """
+        Look up many keys with one OR search per chunk of keys, chunks running
+        concurrently. The key is read from the field named by meta["key_field"]
+        (default "key"). Returns ({key: entity}, [keys that were not found]).
+        """
+        key_field = meta.get("key_field", "key")
+        fields = meta.get("fields")
+        if fields and key_field not in fields:
+            # Matches are told apart by their key, so a projection must keep it
+            meta = {**meta, "fields": [*fields, key_field]}
+        unique_keys = list(dict.fromkeys(keys))
+        maybe_present, absent = _key_filter.filter_absent(_key_filter_model(meta), unique_keys,
+                                                          lambda: self._scan_keys(meta, key_field))
+        chunks = [maybe_present[i:i + chunk_size] for i in range(0, len(maybe_present), chunk_size)]
+        pages = await asyncio.gather(*(self.find_all_by_criteria(meta, _keys_condition(key_field, chunk))
+                                       for chunk in chunks))
+        wanted = set(unique_keys)
+        found = {}
+        for entities in pages:
+            for entity in entities:
+                key = _field_value(entity, key_field)
+                if key in wanted and key not in found:
+                    found[key] = entity
+        if meta.get("fields") is not fields:
+            found = {key: project(entity, fields) for key, entity in found.items()}
+        not_found = [key for key in maybe_present if key not in found]
+        _key_filter.record_misses(_key_filter_model(meta), len(not_found))
+        missing = absent + not_found
+        if missing:
+            logger.debug(f"{len(missing)} of {len(unique_keys)} keys not found for {meta.get('entity_model')}")
+        return found, missing
+
+    async def _scan_keys(self, meta, key_field: str) -> AsyncIterator[List[Any]]:
+        """Every key of the model, page by page."""
+        scan_meta = {"entity_model": meta["entity_model"], "entity_version": meta["entity_version"],
+                     "fields": [key_field]}
+        # A partial scan would report existing keys as absent, so every failure must fail the scan
+        async for page in self.iter_pages_by_criteria(scan_meta, _ALL_ENTITIES, strict=True):
+            yield [_field_value(entity, key_field) for entity in page]
 
     async def find_by_key(self, meta, key: Any) -> Optional[Any]:
-        # If the user has pre‑set meta["condition"], use that; otherwise search by {"key": key}
-        criteria = meta.get("condition") or {"key": key}
+        # If the user has pre‑set meta["condition"], use that; otherwise search on the key field
+        criteria = meta.get("condition") or _keys_condition(meta.get("key_field", "key"), [key])
         entities = await self.find_all_by_criteria(meta, criteria)
         return entities[0] if entities else None
 
@@ -118,63 +270,156 @@ class CyodaRepository(CrudRepository):
             if _uuid in _edge_messages_cache:
                 return _edge_messages_cache[_uuid]
             path = f"message/get/{_uuid}"
-            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path)
+            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path,
+                                            hedge=True)
             content = resp.get("json", {}).get("content", "{}")
-            data = json.loads(content).get("edge_message_content")
+            data = json_codec.loads(content).get("edge_message_content")
             if data:
                 _edge_messages_cache[_uuid] = data
             return data
 
         path = f"entity/{_uuid}"
-        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path)
+        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path,
+                                        hedge=True)
         payload = resp.get("json", {})
-        data = payload.get("data", {})
+        data = project(payload.get("data", {}), meta.get("fields") if meta else None)
         data["current_state"] = payload.get("meta", {}).get("state")
         data["technical_id"] = _uuid
         return data
 
     async def find_all_by_criteria(self, meta, criteria: Any) -> List[Any]:
-        # 1) trigger snapshot
+        return await _query_cache.get_or_load(meta['entity_model'], meta['entity_version'], criteria,
+                                              lambda: self._search_all(meta, criteria),
+                                              variant=tuple(meta.get("fields") or ()))
+
+    async def _search_all(self, meta, criteria: Any) -> List[Any]:
+        entities = []
+        async for page in self.iter_pages_by_criteria(meta, criteria):
+            entities.extend(page)
+        return entities
+
+    async def iter_pages_by_criteria(self, meta, criteria: Any,
+                                     page_size: int = CYODA_SEARCH_PAGE_SIZE,
+                                     strict: bool = False) -> AsyncIterator[List[Any]]:
+        """
+        Stream every page of a snapshot search. Page N+1 is fetched while the
+        caller handles page N, so at most two pages are held in memory at a time.
+        A page after the first that cannot be fetched raises; with strict=True
+        so does a failed search or first page, instead of yielding nothing.
+        """
+        snapshot_id = await self._create_snapshot(meta, criteria)
+        if snapshot_id is None:
+            if strict:
+                raise Exception(f"Failed to create a search snapshot for {meta['entity_model']}")
+            return
+
+        fields = meta.get("fields")
+        page, total_pages = await self._fetch_snapshot_page(snapshot_id, 0, page_size, fields, strict)
+        page_number = 0
+        prefetch = None
+        try:
+            while page:
+                page_number += 1
+                if page_number < total_pages:
+                    prefetch = asyncio.ensure_future(self._fetch_snapshot_page(snapshot_id, page_number,
+                                                                                   page_size, fields))
+                yield page
+                if prefetch is None:
+                    return
+                page, _ = await prefetch
+                prefetch = None
+        finally:
+            # The caller stopped early; do not leave the prefetch running
+            if prefetch is not None and not prefetch.done():
+                prefetch.cancel()
+
+    async def _create_snapshot(self, meta, criteria: Any) -> Optional[str]:
         snap_path = f"search/snapshot/{meta['entity_model']}/{meta['entity_version']}"
-        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="post", path=snap_path, data=json.dumps(criteria))
+        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="post", path=snap_path,
+                                        data=_criteria_body(criteria))
+        if resp.get("status") != 200:
+            return None
         snapshot_id = resp.get("json")
+        shape = (meta['entity_model'], str(meta['entity_version']), criteria_shape(criteria))
+        await self._wait_for_search_completion(snapshot_id, shape=shape)
+        return snapshot_id
 
-        # 2) poll until ready
-        await self._wait_for_search_completion(snapshot_id)
-
-        # 3) fetch results (first page)
-        result_resp = await send_cyoda_request(
+    async def _get_snapshot_page(self, snapshot_id: str, page_number: int, page_size: int,
+                                 strict: bool = False) -> dict:
+        resp = await send_cyoda_request(
             cyoda_auth_service=self._cyoda_auth_service,
             method="get",
-            path=f"search/snapshot/{snapshot_id}"
+            path=f"search/snapshot/{snapshot_id}?pageSize={page_size}&pageNumber={page_number}",
         )
-        if result_resp.get("status") != 200:
-            return []
-        resp_json = json.loads(result_resp.get("json", "{}"))
-
-        if resp_json.get("page", {}).get("totalElements", 0) == 0:
-            return []
-
-        nodes = resp_json.get("_embedded", {}).get("objectNodes", [])
-        entities = []
-        for node in nodes:
-            tree = node.get("data", {})
-            if not tree.get("technical_id"):
-                tree["technical_id"] = node.get("meta", {}).get("id")
-            entities.append(tree)
-
-        return entities
-
+        if resp.get("status") != 200:
+            if page_number > 0 or strict:
+                # Past the first page the snapshot is known to have more; stopping here would truncate the result
+                raise Exception(f"HTTP {resp.get('status')}: failed to fetch page {page_number} "
+                                f"of snapshot {snapshot_id}")
+            return {}
+        resp_json = resp.get("json") or {}
+        # The snapshot page may arrive as JSON text rather than an already decoded document
+        if isinstance(resp_json, (str, bytes)):
+            resp_json = json_codec.loads(resp_json)
+        return resp_json
+
+    async def _fetch_snapshot_page(self, snapshot_id: str, page_number: int, page_size: int,
+                                   fields: Optional[List[str]] = None, strict: bool = False):
+        """
+        Fetch and decode one page of a snapshot, projected to the given fields.
+        Returns (entities, total_pages).
+        """
+        resp_json = await self._get_snapshot_page(snapshot_id, page_number, page_size, strict)
+        page_info = resp_json.get("page", {})
+        if page_info.get("totalElements", 0) == 0:
+            return [], 0
+        return _page_entities(resp_json, fields), page_info.get("totalPages", 1)
+
+    async def find_page_by_criteria(self, meta, criteria: Any, cursor: Optional[str] = None,
+                                    page_size: int = CYODA_SEARCH_PAGE_SIZE) -> Tuple[List[Any], Optional[str], int]:
+        """
+        One page of a search. Without a cursor the search runs and the first page
+        is returned; with one, the next page is read from the same snapshot.
+        Returns (entities, next cursor or None, total number of matches).
+        """
+        fields = meta.get("fields")
+        digest = search_digest(meta, criteria, fields)
+        if cursor:
+            position = PageCursor.decode(cursor)
+            if position.digest != digest:
+                raise InvalidCursorException("Page cursor does not belong to this search")
+            snapshot_id, page_number, page_size = position.snapshot_id, position.page_number, position.page_size
+            if not _snapshot_handles.touch(snapshot_id):
+                # The snapshot has been let go; search again and continue at the same page
+                snapshot_id = await self._create_snapshot(meta, criteria)
+        else:
+            snapshot_id, page_number = await self._create_snapshot(meta, criteria), 0
+        if snapshot_id is None:
+            return [], None, 0
+        _snapshot_handles.add(snapshot_id)
+
+        resp_json = await self._get_snapshot_page(snapshot_id, page_number, page_size)
+        page_info = resp_json.get("page", {})
+        total = page_info.get("totalElements", 0)
+        if total == 0:
+            return [], None, 0
+        next_cursor = None
+        if page_number + 1 < page_info.get("totalPages", 1):
+            next_cursor = PageCursor(snapshot_id, page_number + 1, page_size, digest).encode()
+        return _page_entities(resp_json, fields), next_cursor, total
+
+    @_invalidates_queries
     async def save(self, meta, entity: Any) -> Any:
         if meta.get("type") == CYODA_ENTITY_TYPE_EDGE_MESSAGE:
             payload = {
                 "meta-data": {"source": "ai_assistant"},
                 "payload": {"edge_message_content": entity},
             }
-            data = json.dumps(payload, default=custom_serializer)
+            data = json_codec.dumps_bytes(payload, default=custom_serializer)
             path = f"message/new/{meta['entity_model']}_{meta['entity_version']}"
         else:
-            data = json.dumps(entity, default=custom_serializer)
+            _record_keys(meta, [entity])
+            data = json_codec.dumps_bytes(entity, default=custom_serializer)
             path = f"entity/JSON/{meta['entity_model']}/{meta['entity_version']}"
 
         resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="post", path=path, data=data)
@@ -189,29 +434,58 @@ class CyodaRepository(CrudRepository):
 
         return technical_id
 
-    async def save_all(self, meta, entities: List[Any]) -> Any:
-        # restore v1 behavior: return first entity ID only
-        data = json.dumps(entities, default=custom_serializer)
+    @_invalidates_queries
+    async def save_all(self, meta, entities: List[Any],
+                       on_progress: Optional[Callable[[int, int], Any]] = None) -> List[Any]:
+        """
+        Save entities and return their technical ids in input order. Large inputs
+        are split into chunks (CYODA_BULK_CHUNK_SIZE entities, CYODA_BULK_CHUNK_MAX_BYTES)
+        sent CYODA_BULK_WRITE_CONCURRENCY at a time on the bulk lane (or meta["lane"]).
+        Each chunk is one transaction; if any fail, BulkWriteException lists them
+        and carries the ids of the chunks that were saved.
+        """
+        if not entities:
+            return []
+        _record_keys(meta, entities)
         path = f"entity/JSON/{meta['entity_model']}/{meta['entity_version']}"
-        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="post", path=path, data=data)
-        result = resp.get("json", [])
-
-        technical_id = None
-        if isinstance(result, list) and result:
-            technical_id = result[0].get("entityIds", [None])[0]
-
-        return technical_id
-
+        encoded = [json_codec.dumps_bytes(entity, default=custom_serializer) for entity in entities]
+
+        async def send_chunk(chunk):
+            _, items = chunk
+            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="post", path=path,
+                                            data=json_array(items))
+            result = resp.get("json")
+            if resp.get("status") != 200 or not isinstance(result, list):
+                raise Exception(f"HTTP {resp.get('status')}: {result}")
+            return [technical_id for transaction in result for technical_id in transaction.get("entityIds", [])]
+
+        with outbound_lane(meta.get("lane") or BULK_LANE):
+            return await run_chunks(chunk_encoded(encoded), len(entities), send_chunk, what="save_all",
+                                    on_progress=on_progress)
+
+    @_invalidates_queries
     async def update(self, meta, technical_id: Any, entity: Any = None) -> Any:
         if entity is None:
             return await self._launch_transition(meta=meta, technical_id=technical_id)
 
         transition = meta.get("update_transition", UPDATE_TRANSITION)
+        _record_keys(meta, [entity])
+        if _update_coalescer.enabled:
+            lane = current_lane()
+
+            async def send(latest):
+                with outbound_lane(lane):
+                    return await self._put_update(technical_id, transition, latest)
+
+            return await _update_coalescer.submit((technical_id, transition), entity, send)
+        return await self._put_update(technical_id, transition, entity)
+
+    async def _put_update(self, technical_id: Any, transition: str, entity: Any) -> Any:
         path = (
             f"entity/JSON/{technical_id}/{transition}"
             "?transactional=true&waitForConsistencyAfter=true"
         )
-        data = json.dumps(entity, default=custom_serializer)
+        data = json_codec.dumps_bytes(entity, default=custom_serializer)
         resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="put", path=path, data=data)
         result = resp.get("json", {})
         if not isinstance(result, dict):
@@ -219,23 +493,106 @@ class CyodaRepository(CrudRepository):
             return None
         return result.get("entityIds", [None])[0]
 
-    async def update_all(self, meta, entities: List[Any]) -> List[Any]:
-        payload = []
-        for ent in entities:
-            payload.append({
-                "id": meta.get("technical_id"),
-                "transition": meta.get("update_transition", UPDATE_TRANSITION),
-                "payload": json.dumps(ent, default=custom_serializer),
-            })
-        data = json.dumps(payload)
-        path = "entity/JSON"
-        await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="put", path=path, data=data)
-        return entities
-
+    @_invalidates_queries
+    async def update_all(self, meta, entities: List[Any],
+                         on_progress: Optional[Callable[[int, int], Any]] = None) -> List[Any]:
+        """
+        Update many entities in chunked, pipelined bulk requests. Each item is a
+        (technical_id, entity) or (technical_id, entity, transition) tuple; a bare
+        entity is updated under its own technical_id (or meta["technical_id"]).
+        The transition defaults to meta["update_transition"]. Returns the ids
+        reported per entity in input order; failed chunks raise BulkWriteException.
+        """
+        if not entities:
+            return []
+        default_transition = meta.get("update_transition", UPDATE_TRANSITION)
+        encoded = []
+        for item in entities:
+            if isinstance(item, tuple):
+                technical_id, entity, transition = (item + (default_transition,))[:3]
+            else:
+                entity, transition = item, default_transition
+                technical_id = item.get("technical_id") if isinstance(item, dict) else getattr(item, "technical_id", None)
+                technical_id = technical_id or meta.get("technical_id")
+            # The API takes each entity as a JSON string: encode it once and splice the item together
+            entity_json = json_codec.dumps(entity, default=custom_serializer)
+            encoded.append(b'{"id":' + json_codec.dumps_bytes(technical_id) +
+                           b',"transition":' + json_codec.dumps_bytes(transition) +
+                           b',"payload":' + json_codec.dumps_bytes(entity_json) + b"}")
+        _record_keys(meta, [item[1] if isinstance(item, tuple) else item for item in entities])
+
+        async def send_chunk(chunk):
+            _, items = chunk
+            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="put",
+                                            path="entity/JSON", data=json_array(items))
+            result = resp.get("json")
+            if resp.get("status") != 200 or not isinstance(result, list):
+                raise Exception(f"HTTP {resp.get('status')}: {result}")
+            return [technical_id for transaction in result for technical_id in transaction.get("entityIds", [])]
+
+        with outbound_lane(meta.get("lane") or BULK_LANE):
+            return await run_chunks(chunk_encoded(encoded), len(entities), send_chunk, what="update_all",
+                                    on_progress=on_progress)
+
+    @_invalidates_queries
     async def delete_by_id(self, meta, technical_id: Any) -> None:
         path = f"entity/{technical_id}"
         await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="delete", path=path)
 
+    @_invalidates_queries
+    async def delete_by_ids(self, meta, technical_ids: List[Any],
+                            on_progress: Optional[Callable[[int, int], Any]] = None,
+                            concurrency: int = CYODA_BULK_DELETE_CONCURRENCY) -> Dict[Any, dict]:
+        """
+        Delete many entities, up to `concurrency` at a time on the bulk lane
+        (or meta["lane"]), so throughput follows the lane and adaptive limits
+        rather than one round-trip per entity. on_progress(done, total) is
+        called after each delete. Returns {technical_id: {"status": "deleted" |
+        "not_found" | "failed", "error": ...}}.
+        """
+        ids = list(dict.fromkeys(technical_ids))
+        outcomes: Dict[Any, dict] = {}
+        pending = iter(ids)
+        log_every = max(1, len(ids) // 10)
+
+        async def worker():
+            for technical_id in pending:
+                outcomes[technical_id] = await self._delete_one(technical_id)
+                done = len(outcomes)
+                if on_progress is not None:
+                    on_progress(done, len(ids))
+                if done % log_every == 0:
+                    logger.info(f"Deleted {done}/{len(ids)} {meta.get('entity_model', '')} entities")
+
+        with outbound_lane(meta.get("lane") or BULK_LANE):
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, len(ids)))))
+        failed = sum(1 for outcome in outcomes.values() if outcome["status"] == "failed")
+        if failed:
+            logger.warning(f"{failed} of {len(ids)} deletes failed")
+        return outcomes
+
+    async def _delete_one(self, technical_id: Any) -> dict:
+        try:
+            resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="delete",
+                                            path=f"entity/{technical_id}")
+        except Exception as e:
+            return {"status": "failed", "error": str(e) or type(e).__name__}
+        status = resp.get("status")
+        if status == 404:
+            return {"status": "not_found"}
+        if status is None or status >= 400:
+            return {"status": "failed", "error": resp.get("json")}
+        return {"status": "deleted"}
+
+    def stats(self) -> dict:
+        return {
+            "key_filter": _key_filter.stats(),
+            "query_cache": _query_cache.stats(),
+            "snapshot_poller": self._snapshot_poller.stats(),
+            "snapshot_handles": _snapshot_handles.stats(),
+            "update_coalescing": _update_coalescer.stats(),
+        }
+
     async def get_transitions(self, meta, technical_id: Any) -> Any:
         entity_class = (
             EDGE_MESSAGE_CLASS
@@ -246,7 +603,8 @@ class CyodaRepository(CrudRepository):
             f"platform-api/entity/fetch/transitions?entityClass={entity_class}"
             f"&entityId={technical_id}"
         )
-        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path)
+        resp = await send_cyoda_request(cyoda_auth_service=self._cyoda_auth_service, method="get", path=path,
+                                        hedge=True)
         return resp.get("json")
 
     async def _launch_transition(self, meta, technical_id):
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Tuple
+
+from common.config.config import (
+    CYODA_KEY_BLOOM_FILTER,
+    CYODA_KEY_BLOOM_FALSE_POSITIVE_RATE,
+    CYODA_KEY_BLOOM_CAPACITY,
+    CYODA_KEY_BLOOM_MAX_BYTES,
+    CYODA_KEY_BLOOM_TTL,
+)
+from common.transport import deadline
+from common.transport.bulkhead import BULK_LANE, outbound_lane
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over the text form of keys.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        bits = max(8, int(math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))))
+        self.size = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self._bits = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def required_bytes(capacity: int, false_positive_rate: float) -> int:
+        return int(math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2) / 8))
+
+    def _positions(self, key: Any):
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: Any) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: Any) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class _ModelKeys:
+    __slots__ = ("bloom", "built_at")
+
+    def __init__(self, bloom: BloomFilter):
+        self.bloom = bloom
+        self.built_at = 0.0
+
+
+# Keys saved this recently are added to a new filter even if the scan's snapshot missed them
+_RECENT_WINDOW = 60.0
+_RECENT_MAX = 10000
+
+
+class KeyPresenceFilter:
+    """
+    Per-model Bloom filters of entity keys, answering "definitely absent"
+    locally so that lookups of new keys skip the snapshot search.
+
+    A filter is built in the background from a scan of every key of the model
+    (on the bulk lane) the first time the model is checked, and rebuilt once
+    it is older than ttl. Keys written through this app are added as they are
+    saved, including into a filter that is still being built. Deleted keys
+    cannot be removed from a Bloom filter; they read as "maybe present" until
+    the next rebuild, which only costs a search. Keys written by other
+    processes are only picked up by a rebuild, so the ttl bounds how long
+    such a key may be reported absent: with several replicas writing the
+    same model, a key another replica saved may be "not found" for up to
+    ttl. A model whose filter would exceed max_bytes is not filtered.
+    """
+
+    def __init__(self, enabled: bool = CYODA_KEY_BLOOM_FILTER,
+                 false_positive_rate: float = CYODA_KEY_BLOOM_FALSE_POSITIVE_RATE,
+                 capacity: int = CYODA_KEY_BLOOM_CAPACITY,
+                 max_bytes: int = CYODA_KEY_BLOOM_MAX_BYTES,
+                 ttl: float = CYODA_KEY_BLOOM_TTL):
+        self.enabled = enabled
+        self.false_positive_rate = false_positive_rate
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._models: Dict[Tuple, _ModelKeys] = {}
+        self._building: Dict[Tuple, _ModelKeys] = {}
+        self._recent: Dict[Tuple, Deque[Tuple[float, Any]]] = {}
+        self._retry_at: Dict[Tuple, float] = {}
+        self.checks = 0
+        self.definitely_absent = 0
+        self.maybe_present = 0
+        self.false_positives = 0
+
+    def filter_absent(self, model_key: Tuple, keys: List[Any],
+                      scan: Callable[[], AsyncIterator[Iterable[Any]]]) -> Tuple[List[Any], List[Any]]:
+        """
+        Split keys into (maybe present, definitely absent). Starts a (re)build
+        with scan() when the model's filter is missing or stale.
+        """
+        if not self.enabled:
+            return keys, []
+        model = self._models.get(model_key)
+        if model is None or time.monotonic() - model.built_at > self.ttl:
+            self._start_build(model_key, scan)
+        if model is None:
+            return keys, []
+        self.checks += len(keys)
+        maybe, absent = [], []
+        for key in keys:
+            (maybe if key in model.bloom else absent).append(key)
+        self.definitely_absent += len(absent)
+        self.maybe_present += len(maybe)
+        return maybe, absent
+
+    def record_misses(self, model_key: Tuple, count: int) -> None:
+        """Keys that were looked up but do not exist: false positives if the filter let them through."""
+        if self.enabled and model_key in self._models:
+            self.false_positives += count
+
+    def add(self, model_key: Tuple, keys: Iterable[Any]) -> None:
+        """
+        Record keys being saved. Call before the write is sent, so the key is
+        never reported absent once it may exist.
+        """
+        if not self.enabled:
+            return
+        keys = [key for key in keys if key is not None]
+        recent = self._recent.get(model_key)
+        if recent is None:
+            recent = self._recent[model_key] = deque(maxlen=_RECENT_MAX)
+        now = time.monotonic()
+        recent.extend((now, key) for key in keys)
+        for model in (self._models.get(model_key), self._building.get(model_key)):
+            if model is not None:
+                for key in keys:
+                    model.bloom.add(key)
+
+    def _start_build(self, model_key: Tuple, scan: Callable[[], AsyncIterator[Iterable[Any]]]) -> None:
+        if model_key in self._building or self._retry_at.get(model_key, 0.0) > time.monotonic():
+            return
+        previous = self._models.get(model_key)
+        capacity = max(self.capacity, 2 * previous.bloom.count if previous else 0)
+        if BloomFilter.required_bytes(capacity, self.false_positive_rate) > self.max_bytes:
+            logger.warning(f"Key filter for {model_key} would exceed {self.max_bytes} bytes; not filtering")
+            self._models.pop(model_key, None)
+            self._retry_at[model_key] = time.monotonic() + self.ttl
+            return
+        building = self._building[model_key] = _ModelKeys(BloomFilter(capacity, self.false_positive_rate))
+        cutoff = time.monotonic() - _RECENT_WINDOW
+        for saved_at, key in self._recent.get(model_key, ()):
+            if saved_at >= cutoff:
+                building.bloom.add(key)
+        deadline.run_detached(self._build(model_key, building, scan))
+
+    async def _build(self, model_key: Tuple, building: _ModelKeys,
+                     scan: Callable[[], AsyncIterator[Iterable[Any]]]) -> None:
+        started = time.monotonic()
+        try:
+            with outbound_lane(BULK_LANE):
+                async for keys in scan():
+                    for key in keys:
+                        if key is not None:
+                            building.bloom.add(key)
+        except Exception as e:
+            logger.warning(f"Building the key filter for {model_key} failed: {e}")
+            self._retry_at[model_key] = time.monotonic() + min(self.ttl, 60.0)
+            return
+        finally:
+            self._building.pop(model_key, None)
+        building.built_at = started
+        self._models[model_key] = building
+        logger.info(f"Key filter for {model_key} built with {building.bloom.count} keys")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "checks": self.checks,
+            "definitely_absent": self.definitely_absent,
+            "maybe_present": self.maybe_present,
+            "false_positives": self.false_positives,
+            # Share of looked-up keys answered locally, and of searched keys that turned out absent
+            "absent_rate": (self.definitely_absent / self.checks) if self.checks else 0.0,
+            "false_positive_rate": (self.false_positives / self.maybe_present) if self.maybe_present else 0.0,
+            "models": {
+                "/".join(str(part) for part in model_key): {
+                    "keys": model.bloom.count,
+                    "bytes": len(model.bloom._bits),
+                    "age": time.monotonic() - model.built_at,
+                }
+                for model_key, model in self._models.items()
+            },
+        }
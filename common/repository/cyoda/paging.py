@@ -0,0 +1,85 @@
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from common.config.config import (
+    CYODA_SNAPSHOT_HANDLE_TTL,
+    CYODA_SNAPSHOT_HANDLE_MAX_ENTRIES,
+)
+from common.exception.exceptions import InvalidCursorException
+from common.repository.cyoda.query_cache import canonical_criteria
+
+
+class PageCursor:
+    """
+    Position in a paged search: the snapshot, the next page number and the
+    page size, plus a digest of the search so the cursor cannot be replayed
+    against different criteria.
+    """
+    __slots__ = ("snapshot_id", "page_number", "page_size", "digest")
+
+    def __init__(self, snapshot_id: str, page_number: int, page_size: int, digest: str):
+        self.snapshot_id = snapshot_id
+        self.page_number = page_number
+        self.page_size = page_size
+        self.digest = digest
+
+    def encode(self) -> str:
+        raw = json.dumps([self.snapshot_id, self.page_number, self.page_size, self.digest], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            snapshot_id, page_number, page_size, digest = json.loads(raw)
+            return cls(str(snapshot_id), int(page_number), int(page_size), str(digest))
+        except (ValueError, TypeError):
+            raise InvalidCursorException()
+
+
+def search_digest(meta, criteria: Any, fields: Optional[List[str]] = None) -> str:
+    text = f"{meta['entity_model']}/{meta['entity_version']}/{canonical_criteria(criteria)}/{fields or ''}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SnapshotHandles:
+    """
+    Snapshots that cursors may still page through, bounded by a TTL and an LRU
+    size limit. A cursor whose snapshot has been dropped makes the caller run
+    the search again and continue at the same page.
+    """
+
+    def __init__(self, ttl: float = CYODA_SNAPSHOT_HANDLE_TTL,
+                 max_entries: int = CYODA_SNAPSHOT_HANDLE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._handles: "OrderedDict[str, float]" = OrderedDict()
+        self.expired = 0
+
+    def add(self, snapshot_id: str) -> None:
+        self._handles[snapshot_id] = time.monotonic() + self.ttl
+        self._handles.move_to_end(snapshot_id)
+        while len(self._handles) > self.max_entries:
+            self._handles.popitem(last=False)
+            self.expired += 1
+
+    def touch(self, snapshot_id: str) -> bool:
+        """
+        Whether the snapshot is still usable; a usable one gets a fresh lifetime.
+        """
+        expires_at = self._handles.get(snapshot_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._handles[snapshot_id]
+            self.expired += 1
+            return False
+        self.add(snapshot_id)
+        return True
+
+    def stats(self) -> dict:
+        return {"handles": len(self._handles), "expired": self.expired}
@@ -0,0 +1,138 @@
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from common.config.config import (
+    CYODA_QUERY_CACHE_TTL,
+    CYODA_QUERY_CACHE_MAX_ENTRIES,
+    CYODA_QUERY_CACHE_SHARE_IN_FLIGHT,
+)
+from common.repository.cyoda.util.query_builder import CompiledQuery, Query
+from common.transport.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_criteria(criteria: Any) -> str:
+    """
+    Key-order independent text form of a search criteria document.
+    """
+    if isinstance(criteria, Query):
+        criteria = criteria.build()
+    if isinstance(criteria, CompiledQuery):
+        return criteria.to_bytes().decode("utf-8")
+    return json.dumps(criteria, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def criteria_shape(criteria: Any) -> Hashable:
+    """
+    The criteria without their values: searches of one shape differ only in
+    the values they compare against.
+    """
+    if isinstance(criteria, Query):
+        return criteria.structure()
+    if isinstance(criteria, CompiledQuery):
+        # The rendered fragments, not the template's id: an id can be reused
+        # once the memoised template is evicted and collected
+        return criteria._template.fragments
+    return json.dumps(_without_values(criteria), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _without_values(criteria: Any) -> Any:
+    if isinstance(criteria, dict):
+        return {key: _without_values(value) for key, value in criteria.items() if key != "value"}
+    if isinstance(criteria, list):
+        return [_without_values(item) for item in criteria]
+    return criteria
+
+
+class QueryCache:
+    """
+    TTL and size bounded cache of search results per (entity_model,
+    entity_version, criteria).
+
+    Identical concurrent searches share one snapshot unless share_in_flight is
+    off; this is its own setting rather than CYODA_COALESCE_GETS, which covers
+    plain GETs, while a search is a POST that creates a snapshot. Every write
+    to a model bumps that model's generation: cached results of the model are
+    dropped, and searches already in flight may still answer the callers that
+    started them but neither fill the cache nor pick up callers that arrive
+    after the write. A ttl of 0 disables caching but keeps the sharing of
+    concurrent searches.
+    """
+
+    def __init__(self, ttl: float = CYODA_QUERY_CACHE_TTL, max_entries: int = CYODA_QUERY_CACHE_MAX_ENTRIES,
+                 share_in_flight: bool = CYODA_QUERY_CACHE_SHARE_IN_FLIGHT):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.share_in_flight = share_in_flight
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _generation(self, entity_model: str) -> Tuple[int, int]:
+        return self._global_generation, self._generations.get(entity_model, 0)
+
+    async def get_or_load(self, entity_model: str, entity_version: Any, criteria: Any,
+                          load: Callable[[], Awaitable[Any]], variant: Hashable = None) -> Any:
+        """
+        Cached or shared result of load(). variant tells apart loads of the same
+        criteria that shape their results differently, e.g. by projection.
+        """
+        key = (entity_model, str(entity_version), canonical_criteria(criteria), variant)
+        if self.ttl > 0:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+        self.misses += 1
+
+        generation = self._generation(entity_model)
+
+        async def fill():
+            result = await load()
+            if self.ttl > 0 and self._generation(entity_model) == generation:
+                self._store(key, result)
+            return result
+
+        if not self.share_in_flight:
+            return await fill()
+        return await self._flights.do(key + generation, fill)
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, entity_model: Optional[str] = None) -> None:
+        """
+        Drop the cached results of a model, or of every model when it is unknown.
+        """
+        self.invalidations += 1
+        if entity_model is None:
+            self._global_generation += 1
+            self._entries.clear()
+            return
+        self._generations[entity_model] = self._generations.get(entity_model, 0) + 1
+        for key in [key for key in self._entries if key[0] == entity_model]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "shared": self._flights.stats(),
+        }
@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from common.config.config import (
+    CYODA_SNAPSHOT_POLL_MIN_INTERVAL,
+    CYODA_SNAPSHOT_POLL_MAX_INTERVAL,
+    CYODA_SNAPSHOT_POLL_CONCURRENCY,
+)
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+# Before this many searches of a shape have completed there is no usable completion-time estimate
+_MIN_SAMPLES = 10
+# Search shapes whose completion times are remembered
+_MAX_SHAPES = 256
+
+
+class _PendingSnapshot:
+    __slots__ = ("snapshot_id", "shape", "started", "future", "waiters", "polls")
+
+    def __init__(self, snapshot_id: str, shape: Hashable, future: asyncio.Future):
+        self.snapshot_id = snapshot_id
+        self.shape = shape
+        self.started = time.monotonic()
+        self.future = future
+        self.waiters = 0
+        self.polls = 0
+
+
+class SnapshotPoller:
+    """
+    One polling loop for every pending snapshot search.
+
+    Waiters get a future that the loop resolves once the snapshot is SUCCESSFUL
+    (or fails). Each snapshot is checked on an exponential schedule: the next
+    check comes after half the time it has already been running, within
+    [min_interval, max_interval]. The first check goes out at once; later ones
+    are pushed out to the 10th percentile of recent completion times of
+    searches of the same shape (model and criteria structure). Delays carry a
+    little jitter and at most max_concurrent checks run at a time, so searches
+    started together do not poll in lockstep.
+    """
+
+    def __init__(self, check_status: Callable[[str], Awaitable[dict]],
+                 min_interval: float = CYODA_SNAPSHOT_POLL_MIN_INTERVAL,
+                 max_interval: float = CYODA_SNAPSHOT_POLL_MAX_INTERVAL,
+                 max_concurrent: int = CYODA_SNAPSHOT_POLL_CONCURRENCY):
+        self._check_status = check_status
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_concurrent = max_concurrent
+        self._pending: Dict[str, _PendingSnapshot] = {}
+        self._schedule: List[Tuple[float, str]] = []
+        self._completion_times: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.completed = 0
+
+    async def wait(self, snapshot_id: str, timeout: float, shape: Hashable = None) -> None:
+        """
+        Wait until the snapshot is ready. The timeout is shortened to the
+        deadline of the calling request, if any. shape groups searches whose
+        completion times are alike.
+        """
+        timeout = deadline.remaining_within(timeout)
+        pending = self._pending.get(snapshot_id)
+        if pending is None:
+            pending = _PendingSnapshot(snapshot_id, shape, asyncio.get_running_loop().create_future())
+            self._pending[snapshot_id] = pending
+            # The first check goes out right away so fast searches pay no extra latency
+            self._schedule_check(pending, 0.0)
+        pending.waiters += 1
+        try:
+            async with asyncio.timeout(timeout):
+                await asyncio.shield(pending.future)
+        except TimeoutError:
+            deadline.check_deadline()
+            raise TimeoutError(f"Timeout exceeded after {timeout} seconds")
+        finally:
+            pending.waiters -= 1
+            if pending.waiters == 0 and not pending.future.done():
+                # Nobody is interested any more; stop polling this snapshot
+                self._pending.pop(snapshot_id, None)
+                pending.future.cancel()
+
+    def _record_completion(self, pending: _PendingSnapshot) -> None:
+        times = self._completion_times.get(pending.shape)
+        if times is None:
+            times = self._completion_times[pending.shape] = deque(maxlen=200)
+            while len(self._completion_times) > _MAX_SHAPES:
+                self._completion_times.popitem(last=False)
+        else:
+            self._completion_times.move_to_end(pending.shape)
+        times.append(time.monotonic() - pending.started)
+
+    def _next_delay(self, pending: _PendingSnapshot) -> float:
+        elapsed = time.monotonic() - pending.started
+        delay = max(self.min_interval, min(self.max_interval, elapsed / 2))
+        times = self._completion_times.get(pending.shape)
+        if times is not None and len(times) >= _MIN_SAMPLES:
+            ordered = sorted(times)
+            early = ordered[len(ordered) // 10]
+            # Few searches finish before the 10th percentile, so checking earlier is mostly wasted
+            delay = max(delay, min(self.max_interval, early - elapsed))
+        return delay * random.uniform(0.9, 1.1)
+
+    def _schedule_check(self, pending: _PendingSnapshot, delay: float) -> None:
+        heapq.heappush(self._schedule, (time.monotonic() + delay, pending.snapshot_id))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = deadline.run_detached(self._run())
+        else:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        checks = set()
+        try:
+            while self._pending:
+                now = time.monotonic()
+                while self._schedule and self._schedule[0][0] <= now:
+                    _, snapshot_id = heapq.heappop(self._schedule)
+                    pending = self._pending.get(snapshot_id)
+                    if pending is not None:
+                        check = asyncio.ensure_future(self._check(pending, semaphore))
+                        checks.add(check)
+                        check.add_done_callback(checks.discard)
+                timeout = self._schedule[0][0] - now if self._schedule else None
+                self._wakeup.clear()
+                try:
+                    async with asyncio.timeout(timeout):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+        finally:
+            for check in checks:
+                check.cancel()
+
+    async def _check(self, pending: _PendingSnapshot, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if pending.future.done():
+                return
+            self.polls += 1
+            pending.polls += 1
+            try:
+                resp = await self._check_status(pending.snapshot_id)
+            except Exception as e:
+                self._finish(pending, error=e)
+                return
+        if resp.get("status") != 200:
+            self._finish(pending)
+            return
+        status = (resp.get("json") or {}).get("snapshotStatus")
+        if status == "SUCCESSFUL":
+            self._record_completion(pending)
+            self._finish(pending)
+        elif status not in ("RUNNING",):
+            self._finish(pending, error=Exception(f"Snapshot search failed: {resp.get('json')}"))
+        elif not pending.future.done():
+            self._schedule_check(pending, self._next_delay(pending))
+
+    def _finish(self, pending: _PendingSnapshot, error: Optional[BaseException] = None) -> None:
+        self._pending.pop(pending.snapshot_id, None)
+        if pending.future.done():
+            return
+        self.completed += 1
+        if error is None:
+            pending.future.set_result(None)
+        else:
+            pending.future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "polls": self.polls,
+            "completed": self.completed,
+            "polls_per_search": (self.polls / self.completed) if self.completed else 0.0,
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from common.config.config import (
+    CYODA_UPDATE_COALESCING,
+    CYODA_UPDATE_COALESCE_WINDOW,
+)
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+Send = Callable[[Any], Awaitable[Any]]
+
+
+class _PendingUpdate:
+    __slots__ = ("entity", "send", "futures")
+
+    def __init__(self, entity: Any, send: Send):
+        self.entity = entity
+        self.send = send
+        self.futures: List[asyncio.Future] = []
+
+
+class UpdateCoalescer:
+    """
+    Last-write-wins coalescing of updates to the same entity and transition.
+
+    The first update for a key waits `window` seconds; updates arriving in the
+    meantime replace the pending state, and only the latest is sent. Every
+    caller whose update was merged gets that single result (or error), waiting
+    no longer than its own deadline. Updates to one key are sent one after
+    another, so an older state can never land after a newer one.
+    """
+
+    def __init__(self, enabled: bool = CYODA_UPDATE_COALESCING, window: float = CYODA_UPDATE_COALESCE_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._pending: Dict[Hashable, _PendingUpdate] = {}
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.updates = 0
+        self.sent = 0
+
+    async def submit(self, key: Hashable, entity: Any, send: Send) -> Any:
+        """
+        Queue the entity as the latest state for key and wait for the result of
+        the update that carries it. send(entity) performs the actual update.
+        """
+        loop = asyncio.get_running_loop()
+        self.updates += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingUpdate(entity, send)
+            loop.call_later(self.window, self._send, key, pending)
+        else:
+            pending.entity, pending.send = entity, send
+        future = loop.create_future()
+        pending.futures.append(future)
+        return await deadline.wait_shared(future, "a coalesced update")
+
+    def _send(self, key: Hashable, pending: _PendingUpdate) -> None:
+        del self._pending[key]
+        self.sent += 1
+        previous = self._in_flight.get(key)
+        task = deadline.run_detached(self._run(pending, previous))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._in_flight.pop(key, None) if self._in_flight.get(key) is done else None)
+
+    @staticmethod
+    async def _run(pending: _PendingUpdate, previous: Optional[asyncio.Task]) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        try:
+            result = await pending.send(pending.entity)
+        except Exception as e:
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future in pending.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "updates": self.updates,
+            "sent": self.sent,
+            "coalesced": self.updates - self.sent - sum(len(p.futures) for p in self._pending.values()),
+        }
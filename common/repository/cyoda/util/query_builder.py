@@ -0,0 +1,261 @@
+"""
+Typed builder for Cyoda search conditions.
+
+    criteria = all_of(
+        field("status").equals("active"),
+        any_of(field("owner").equals(owner), field("shared").is_not_null()),
+    ).build()
+    entities = await repository.find_all_by_criteria(meta, criteria)
+
+Operators use the OPERATION_MAPPING vocabulary: either a label such as
+"greater than" or the Cyoda operation code (GREATER_THAN). A query is split
+into its structure (fields, operators, groups) and its values. The structure
+is compiled once into JSON fragments and memoised, so building a query of a
+known shape only serializes its values.
+
+On hot paths, prepare the query once with named parameters and bind the
+values per call:
+
+    ACTIVE_BY_OWNER = all_of(field("status").equals("active"), field("owner").equals(param("owner"))).prepare()
+    criteria = ACTIVE_BY_OWNER.bind(owner=owner)
+"""
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from common.repository.cyoda.util.search_models import Condition, SearchConditionRequest
+from common.repository.cyoda.util.workflow_to_dto_converter import OPERATION_MAPPING
+from common.utils import json_codec
+
+_OPERATIONS = {label: mapping["operation"] for label, mapping in OPERATION_MAPPING.items()}
+_OPERATION_CODES = set(_OPERATIONS.values())
+_NO_VALUE_OPERATIONS = {"IS_NULL", "NOT_NULL"}
+
+_PLACEHOLDER = "__cyoda_query_value_{}__"
+
+
+def _operation_code(operator: str) -> str:
+    if operator in _OPERATION_CODES:
+        return operator
+    code = _OPERATIONS.get(operator.lower())
+    if code is None:
+        raise ValueError(f"Unsupported operation: {operator}")
+    return code
+
+
+class Param:
+    """
+    Named placeholder for a value that is supplied when a prepared query is bound.
+    """
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def param(name: str) -> Param:
+    return Param(name)
+
+
+class Query(ABC):
+    """
+    A condition or group of conditions. Call build() to get the criteria, or
+    prepare() when the query has parameters.
+    """
+
+    @abstractmethod
+    def structure(self) -> Tuple:
+        pass
+
+    @abstractmethod
+    def values(self) -> List[Any]:
+        pass
+
+    def build(self) -> "CompiledQuery":
+        values = self.values()
+        if any(isinstance(value, Param) for value in values):
+            raise ValueError("Query has parameters; use prepare().bind(...)")
+        return CompiledQuery(_compile(self.structure()), values)
+
+    def prepare(self) -> "PreparedQuery":
+        return PreparedQuery(_compile(self.structure()), self.values())
+
+    def __and__(self, other: "Query") -> "Query":
+        return all_of(self, other)
+
+    def __or__(self, other: "Query") -> "Query":
+        return any_of(self, other)
+
+
+class Predicate(Query):
+    def __init__(self, path: str, operator: str, value: Any = None):
+        self.path = path
+        self.operation = _operation_code(operator)
+        self.value = value
+
+    def structure(self) -> Tuple:
+        return "simple", self.path, self.operation
+
+    def values(self) -> List[Any]:
+        return [] if self.operation in _NO_VALUE_OPERATIONS else [self.value]
+
+
+class Group(Query):
+    def __init__(self, operator: str, queries: Tuple[Query, ...]):
+        if operator not in ("AND", "OR"):
+            raise ValueError(f"Unsupported group operator: {operator}")
+        self.operator = operator
+        self.queries = queries
+
+    def structure(self) -> Tuple:
+        return ("group", self.operator) + tuple(query.structure() for query in self.queries)
+
+    def values(self) -> List[Any]:
+        return [value for query in self.queries for value in query.values()]
+
+
+class Field:
+    """
+    A field of the entity, addressed by a dotted path ("address.city") or a JSON path ("$.address.city").
+    """
+
+    def __init__(self, path: str):
+        self.path = path if path.startswith("$") else f"$.{path}"
+
+    def op(self, operator: str, value: Any = None) -> Predicate:
+        return Predicate(self.path, operator, value)
+
+    def equals(self, value: Any) -> Predicate:
+        return self.op("EQUALS", value)
+
+    def not_equal(self, value: Any) -> Predicate:
+        return self.op("NOT_EQUAL", value)
+
+    def iequals(self, value: Any) -> Predicate:
+        return self.op("IEQUALS", value)
+
+    def contains(self, value: Any) -> Predicate:
+        return self.op("CONTAINS", value)
+
+    def istarts_with(self, value: Any) -> Predicate:
+        return self.op("ISTARTS_WITH", value)
+
+    def iends_with(self, value: Any) -> Predicate:
+        return self.op("IENDS_WITH", value)
+
+    def less_than(self, value: Any) -> Predicate:
+        return self.op("LESS_THAN", value)
+
+    def less_or_equal(self, value: Any) -> Predicate:
+        return self.op("LESS_OR_EQUAL", value)
+
+    def greater_than(self, value: Any) -> Predicate:
+        return self.op("GREATER_THAN", value)
+
+    def greater_or_equal(self, value: Any) -> Predicate:
+        return self.op("GREATER_OR_EQUAL", value)
+
+    def is_null(self) -> Predicate:
+        return self.op("IS_NULL")
+
+    def is_not_null(self) -> Predicate:
+        return self.op("NOT_NULL")
+
+
+def field(path: str) -> Field:
+    return Field(path)
+
+
+def all_of(*queries: Query) -> Group:
+    return Group("AND", queries)
+
+
+def any_of(*queries: Query) -> Group:
+    return Group("OR", queries)
+
+
+class _Template:
+    """
+    Compiled structure: JSON fragments between which the values are spliced.
+    """
+    __slots__ = ("fragments",)
+
+    def __init__(self, fragments: List[bytes]):
+        self.fragments: Tuple[bytes, ...] = tuple(fragments)
+
+    def render(self, values: List[Any]) -> bytes:
+        parts = [self.fragments[0]]
+        for value, fragment in zip(values, self.fragments[1:]):
+            parts.append(json_codec.dumps_bytes(value, default=str))
+            parts.append(fragment)
+        return b"".join(parts)
+
+
+def _to_model(structure: Tuple, counter: List[int]):
+    if structure[0] == "simple":
+        _, path, operation = structure
+        if operation in _NO_VALUE_OPERATIONS:
+            value = None
+        else:
+            value = _PLACEHOLDER.format(counter[0])
+            counter[0] += 1
+        return Condition(type="simple", jsonPath=path, operatorType=operation, value=value)
+    _, operator, *children = structure
+    return SearchConditionRequest(type="group", operator=operator,
+                                  conditions=[_to_model(child, counter) for child in children])
+
+
+@lru_cache(maxsize=1024)
+def _compile(structure: Tuple) -> _Template:
+    counter = [0]
+    text = json.dumps(asdict(_to_model(structure, counter)), separators=(",", ":"))
+    fragments = []
+    for index in range(counter[0]):
+        head, text = text.split(json.dumps(_PLACEHOLDER.format(index)), 1)
+        fragments.append(head.encode("utf-8"))
+    fragments.append(text.encode("utf-8"))
+    return _Template(fragments)
+
+
+class PreparedQuery:
+    """
+    A compiled query whose parameters are bound per call.
+    """
+    __slots__ = ("_template", "_values", "_params")
+
+    def __init__(self, template: _Template, values: List[Any]):
+        self._template = template
+        self._values = values
+        self._params = {value.name for value in values if isinstance(value, Param)}
+
+    def bind(self, **params: Any) -> "CompiledQuery":
+        missing = self._params.difference(params)
+        if missing:
+            raise ValueError(f"Missing query parameters: {', '.join(sorted(missing))}")
+        return CompiledQuery(self._template,
+                             [params[value.name] if isinstance(value, Param) else value for value in self._values])
+
+
+class CompiledQuery:
+    """
+    Search criteria ready to send: the compiled structure plus this call's values.
+    """
+    __slots__ = ("_template", "_values", "_body")
+
+    def __init__(self, template: _Template, values: List[Any]):
+        self._template = template
+        self._values = values
+        self._body: Optional[bytes] = None
+
+    def to_bytes(self) -> bytes:
+        if self._body is None:
+            self._body = self._template.render(self._values)
+        return self._body
+
+    def to_dict(self) -> dict:
+        return json_codec.loads(self.to_bytes())
+
+    def __repr__(self) -> str:
+        return f"CompiledQuery({self.to_bytes().decode('utf-8')})"
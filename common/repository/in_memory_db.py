@@ -1,12 +1,31 @@
 import threading
 from typing import List
 
+from common.repository.criteria_evaluator import compile_criteria
 from common.repository.crud_repository import CrudRepository
+from common.repository.projection import project
 from common.utils.utils import *
 
 logger = logging.getLogger('django')
 
 cache = {}
+# (entity_model, entity_version) of each cached entity, by technical id
+models = {}
+
+
+def _model(meta):
+    """Model the meta addresses, or None when it does not name one."""
+    if not meta or "entity_model" not in meta:
+        return None
+    return meta["entity_model"], str(meta.get("entity_version"))
+
+
+def _in_model(meta):
+    """(technical_id, entity) pairs of the cache that belong to the meta's model."""
+    model = _model(meta)
+    if model is None:
+        return list(cache.items())
+    return [(uuid, entity) for uuid, entity in cache.items() if models.get(uuid) == model]
 
 
 class InMemoryRepository(CrudRepository):
@@ -32,7 +51,12 @@ class InMemoryRepository(CrudRepository):
         return {"token": token, "entity_model": entity_model, "entity_version": entity_version}
 
     async def count(self, meta) -> int:
-        pass
+        return len(_in_model(meta))
+
+    async def count_by_criteria(self, meta, criteria: Any) -> int:
+        # Counted without copying or projecting the matches
+        matches = compile_criteria(criteria)
+        return sum(1 for _, entity in _in_model(meta) if matches(entity))
 
     async def delete_all(self, meta) -> None:
         pass
@@ -59,32 +83,46 @@ class InMemoryRepository(CrudRepository):
         pass
 
     async def find_by_id(self, meta, uuid: Any) -> Optional[Any]:
-        return cache.get(uuid)
+        entity = cache.get(uuid)
+        if entity is None:
+            return None
+        return project(entity, meta.get("fields") if meta else None)
 
     async def find_all_by_criteria(self, meta, criteria: Any) -> Optional[Any]:
+        matches = compile_criteria(criteria)
+        fields = meta.get("fields") if meta else None
         entities = []
-        for uuid in cache:
-            if cache[uuid][criteria["key"]] == criteria["value"]:
-                cache[uuid]['technical_id'] = uuid
-                entities.append(cache[uuid])
+        for uuid, entity in _in_model(meta):
+            if matches(entity):
+                entity['technical_id'] = uuid
+                entities.append(project(entity, fields))
         return entities
 
     async def save(self, meta, entity: Any) -> Any:
         uuid = str(generate_uuid())
         cache[uuid] = entity
+        models[uuid] = _model(meta)
         return uuid
 
-    async def save_all(self, meta, entities: List[Any]) -> bool:
-        pass
+    async def save_all(self, meta, entities: List[Any]) -> List[Any]:
+        return [await self.save(meta, entity) for entity in entities]
 
     async def update(self, meta, id, entity: Any) -> Any:
         cache[id] = entity
+        models.setdefault(id, _model(meta))
 
     async def update_all(self, meta, entities: List[Any]) -> List[Any]:
-        pass
+        ids = []
+        for item in entities:
+            technical_id, entity = item[:2] if isinstance(item, tuple) else (item.get("technical_id"), item)
+            cache[technical_id] = entity
+            models.setdefault(technical_id, _model(meta))
+            ids.append(technical_id)
+        return ids
 
     async def delete(self, meta, entity: Any) -> None:
         pass
 
     async def delete_by_id(self, meta, technical_id: Any) -> None:
         del cache[technical_id]
+        models.pop(technical_id, None)
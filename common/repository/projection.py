@@ -0,0 +1,51 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Always kept, so a projected entity can still be addressed
+_ALWAYS_KEPT = ("technical_id", "current_state")
+
+
+@lru_cache(maxsize=256)
+def compile_projection(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Turn field paths ("name", "address.city", "$.address.zip") into a tree of
+    nested dicts, where True marks a field that is kept whole.
+    """
+    tree: Dict[str, Any] = {}
+    for path in fields:
+        parts = path[2:].split(".") if path.startswith("$.") else path.split(".")
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def _prune(value: Any, tree: Dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_prune(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    pruned = {}
+    for name, subtree in tree.items():
+        if name in value:
+            pruned[name] = value[name] if subtree is True else _prune(value[name], subtree)
+    return pruned
+
+
+def project(entity: Any, fields: Optional[Iterable[str]]) -> Any:
+    """
+    Keep only the given field paths of an entity (and its technical id and
+    state). Lists are projected element by element. No fields keeps everything.
+    """
+    if not fields or not isinstance(entity, dict):
+        return entity
+    pruned = _prune(entity, compile_projection(tuple(fields)))
+    for name in _ALWAYS_KEPT:
+        if name in entity:
+            pruned[name] = entity[name]
+    return pruned
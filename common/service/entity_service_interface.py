@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import List, Any, AsyncIterator, Callable, Dict
 
 class EntityService(ABC):
 
     @abstractmethod
-    async def get_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, meta=None) -> Any:
-        """Retrieve a single item based on its ID."""
+    async def get_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, meta=None,
+                       fields: List[str] = None) -> Any:
+        """Retrieve a single item based on its ID, optionally only the given fields."""
         pass
 
     @abstractmethod
@@ -14,26 +15,73 @@ class EntityService(ABC):
         pass
 
     @abstractmethod
-    async def get_single_item_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> List[Any]:
+    async def get_single_item_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                           fields: List[str] = None) -> List[Any]:
         """Retrieve multiple items based on their IDs."""
         pass
 
     @abstractmethod
-    async def get_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> List[Any]:
+    async def get_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                     fields: List[str] = None) -> List[Any]:
         """Retrieve multiple items based on their IDs."""
         pass
 
+    @abstractmethod
+    def iter_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                fields: List[str] = None) -> AsyncIterator[List[Any]]:
+        """Stream the items matching the condition page by page."""
+        pass
+
+    @abstractmethod
+    async def get_items_page(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                             cursor: str = None, page_size: int = None, fields: List[str] = None) -> dict:
+        """Retrieve one page of the items matching the condition: {"items", "next_cursor", "total"}."""
+        pass
+
+    @abstractmethod
+    async def count_items(self, token: str, entity_model: str, entity_version: str) -> int:
+        """Count all items of the model."""
+        pass
+
+    @abstractmethod
+    async def count_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> int:
+        """Count the items matching the condition."""
+        pass
+
     @abstractmethod
     async def add_item(self, token: str, entity_model: str, entity_version: str, entity: Any, meta: Any = None) -> Any:
         """Add a new item to the repository."""
         pass
 
+    @abstractmethod
+    async def add_items(self, token: str, entity_model: str, entity_version: str, entities: List[Any],
+                        meta: Any = None) -> List[Any]:
+        """Add many items; returns their technical ids in input order."""
+        pass
+
     @abstractmethod
     async def update_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, entity: Any, meta: Any) -> Any:
         """Update an existing item in the repository."""
         pass
 
+    @abstractmethod
+    async def delete_items(self, token: str, entity_model: str, entity_version: str, technical_ids: List[Any],
+                           meta: Any = None, on_progress: Callable[[int, int], Any] = None) -> Dict[Any, dict]:
+        """Delete many items; returns the outcome per technical id."""
+        pass
+
+    @abstractmethod
+    async def update_items(self, token: str, entity_model: str, entity_version: str, updates: List[Any],
+                           meta: Any = None) -> List[Any]:
+        """Update many items given as (technical_id, entity[, transition]) tuples."""
+        pass
+
     @abstractmethod
     async def get_transitions(self, token: str, technical_id: str, meta: Any) -> Any:
         """Get next transitions"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Operational metrics: key-filter hit and false-positive counts, cache and batching state."""
         pass
\ No newline at end of file
@@ -1,14 +1,26 @@
 import logging
 import threading
-from typing import Any, List
+from typing import Any, AsyncIterator, Callable, Dict, List
 
 from common.config.config import CHAT_REPOSITORY
 from common.repository.crud_repository import CrudRepository
 from common.service.entity_service_interface import EntityService
+from common.service.write_batcher import WriteBatcher
+from common.transport.bulkhead import current_lane, outbound_lane
 from common.utils.utils import parse_entity
 
 logger = logging.getLogger('quart')
 
+
+# Opt-in (CYODA_WRITE_BATCHING) merging of concurrent add_item calls into save_all
+_write_batcher = WriteBatcher()
+
+
+def _lane(meta):
+    """Outbound lane requested by the caller through meta["lane"] (interactive, bulk or processor)."""
+    return outbound_lane(meta.get("lane") if isinstance(meta, dict) else None)
+
+
 class EntityServiceImpl(EntityService):
     _instance = None
     _lock = threading.Lock()
@@ -33,15 +45,20 @@ class EntityServiceImpl(EntityService):
         # or add additional initialization app_init here if needed.
         pass
 
-    async def get_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, meta = None) -> Any:
-        """Retrieve a single item based on its ID."""
+    async def get_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, meta = None,
+                       fields: List[str] = None) -> Any:
+        """Retrieve a single item based on its ID, optionally only the given fields."""
         repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
         if meta:
             repository_meta.update(meta)
-        resp = await self._repository.find_by_id(meta, technical_id)
+        if fields:
+            meta = {**(meta or {}), "fields": fields}
+        with _lane(meta):
+            resp = await self._repository.find_by_id(meta, technical_id)
         if resp and isinstance(resp, dict) and resp.get("errorMessage"):
             return []
-        if entity_model:
+        # A projected entity is returned as a plain dict; it would not validate against the model
+        if entity_model and not fields:
             model_cls = self._model_registry.get(entity_model.lower())
             resp = parse_entity(model_cls, resp)
         return resp
@@ -56,43 +73,107 @@ class EntityServiceImpl(EntityService):
         resp = parse_entity(model_cls, resp)
         return resp
 
-    async def get_single_item_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> List[Any]:
+    async def get_single_item_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                           fields: List[str] = None) -> List[Any]:
         """Retrieve multiple items based on their IDs."""
-        resp = await self._find_by_criteria(token, entity_model, entity_version, condition)
+        resp = await self._find_by_criteria(token, entity_model, entity_version, condition, fields)
         if resp and isinstance(resp, dict) and resp.get("errorMessage"):
             return []
+        if fields:
+            return resp
         model_cls = self._model_registry.get(entity_model.lower())
         resp = parse_entity(model_cls, resp)
         return resp
 
-    async def get_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> List[Any]:
+    async def get_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                     fields: List[str] = None) -> List[Any]:
         """Retrieve multiple items based on their IDs."""
-        resp = await self._find_by_criteria(token, entity_model, entity_version, condition.get(CHAT_REPOSITORY))
+        resp = await self._find_by_criteria(token, entity_model, entity_version, condition.get(CHAT_REPOSITORY), fields)
         if resp and isinstance(resp, dict) and resp.get("errorMessage"):
             return []
+        if fields:
+            return resp
         model_cls = self._model_registry.get(entity_model.lower())
         resp = parse_entity(model_cls, resp)
         return resp
 
+    async def iter_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                                      fields: List[str] = None) -> AsyncIterator[List[Any]]:
+        """Stream the items matching the condition page by page."""
+        meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if fields:
+            meta["fields"] = fields
+        model_cls = None if fields else self._model_registry.get(entity_model.lower())
+        async for page in self._repository.iter_pages_by_criteria(meta, condition):
+            yield parse_entity(model_cls, page)
+
+    async def get_items_page(self, token: str, entity_model: str, entity_version: str, condition: Any,
+                             cursor: str = None, page_size: int = None, fields: List[str] = None) -> dict:
+        """Retrieve one page of the items matching the condition: {"items", "next_cursor", "total"}.
+        Pass the returned next_cursor (with the same condition) to get the following page."""
+        meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if fields:
+            meta["fields"] = fields
+        page_args = {"page_size": page_size} if page_size else {}
+        items, next_cursor, total = await self._repository.find_page_by_criteria(meta, condition, cursor, **page_args)
+        model_cls = None if fields else self._model_registry.get(entity_model.lower())
+        return {"items": parse_entity(model_cls, items), "next_cursor": next_cursor, "total": total}
+
+    async def count_items(self, token: str, entity_model: str, entity_version: str) -> int:
+        """Count all items of the model."""
+        meta = await self._repository.get_meta(token, entity_model, entity_version)
+        return await self._repository.count(meta)
+
+    async def count_items_by_condition(self, token: str, entity_model: str, entity_version: str, condition: Any) -> int:
+        """Count the items matching the condition."""
+        meta = await self._repository.get_meta(token, entity_model, entity_version)
+        return await self._repository.count_by_criteria(meta, condition)
+
     async def add_item(self, token: str, entity_model: str, entity_version: str, entity: Any, meta: Any = None) -> Any:
         """Add a new item to the repository."""
         repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
         if meta:
             repository_meta.update(meta)
-        resp = await self._repository.save(repository_meta, entity)
+        if _write_batcher.enabled and (not meta or set(meta) <= {"lane"}):
+            # Plain saves of the same model and lane may share one bulk request
+            lane = repository_meta.get("lane") or current_lane()
+            repository_meta["lane"] = lane
+            return await _write_batcher.submit((entity_model, entity_version, lane), repository_meta, entity,
+                                               self._repository.save_all)
+        with _lane(meta):
+            resp = await self._repository.save(repository_meta, entity)
         return resp
 
+    async def add_items(self, token: str, entity_model: str, entity_version: str, entities: List[Any],
+                        meta: Any = None) -> List[Any]:
+        """Add many items; returns their technical ids in input order."""
+        repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if meta:
+            repository_meta.update(meta)
+        return await self._repository.save_all(repository_meta, entities)
+
     async def update_item(self, token: str, entity_model: str, entity_version: str, technical_id: str, entity: Any, meta: Any) -> Any:
         """Update an existing item in the repository."""
         repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
         meta.update(repository_meta)
-        resp = await self._repository.update(meta=meta, technical_id=technical_id, entity=entity)
+        with _lane(meta):
+            resp = await self._repository.update(meta=meta, technical_id=technical_id, entity=entity)
         return resp
 
-    async def _find_by_criteria(self, token, entity_model, entity_version, condition):
+    async def update_items(self, token: str, entity_model: str, entity_version: str, updates: List[Any],
+                           meta: Any = None) -> List[Any]:
+        """Update many items given as (technical_id, entity[, transition]) tuples."""
+        repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if meta:
+            repository_meta.update(meta)
+        return await self._repository.update_all(repository_meta, updates)
+
+    async def _find_by_criteria(self, token, entity_model, entity_version, condition, fields=None):
         meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if fields:
+            meta["fields"] = fields
         resp = await self._repository.find_all_by_criteria(meta, condition)
-        model_cls = self._model_registry.get(entity_model.lower())
+        model_cls = None if fields else self._model_registry.get(entity_model.lower())
         resp = parse_entity(model_cls, resp)
         return resp
 
@@ -100,10 +181,24 @@ class EntityServiceImpl(EntityService):
         """Update an existing item in the repository."""
         repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
         meta.update(repository_meta)
-        resp = await self._repository.delete_by_id(meta, technical_id)
+        with _lane(meta):
+            resp = await self._repository.delete_by_id(meta, technical_id)
         return resp
 
+    async def delete_items(self, token: str, entity_model: str, entity_version: str, technical_ids: List[Any],
+                           meta: Any = None, on_progress: Callable[[int, int], Any] = None) -> Dict[Any, dict]:
+        """Delete many items; returns the outcome per technical id."""
+        repository_meta = await self._repository.get_meta(token, entity_model, entity_version)
+        if meta:
+            repository_meta.update(meta)
+        return await self._repository.delete_by_ids(repository_meta, technical_ids, on_progress=on_progress)
+
     async def get_transitions(self, token: str, technical_id: str, meta: Any) -> Any:
         """Get next transitions"""
-        resp = await self._repository.get_transitions(meta=meta, technical_id=technical_id)
-        return resp
\ No newline at end of file
+        with _lane(meta):
+            resp = await self._repository.get_transitions(meta=meta, technical_id=technical_id)
+        return resp
+
+    def stats(self) -> dict:
+        """Operational metrics: key-filter hit and false-positive counts, cache and batching state."""
+        return {"repository": self._repository.stats(), "write_batching": _write_batcher.stats()}
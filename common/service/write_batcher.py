@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from common.config.config import (
+    CYODA_WRITE_BATCHING,
+    CYODA_WRITE_BATCH_WINDOW,
+    CYODA_WRITE_BATCH_MAX_ITEMS,
+)
+from common.exception.exceptions import BulkWriteException
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+Flush = Callable[[Any, List[Any]], Awaitable[List[Any]]]
+
+
+class _Batch:
+    __slots__ = ("meta", "flush", "items", "futures", "timer")
+
+    def __init__(self, meta: Any, flush: Flush):
+        self.meta = meta
+        self.flush = flush
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer = None
+
+
+class WriteBatcher:
+    """
+    Merges single-entity saves that arrive close together into one bulk save.
+
+    The first save for a key opens a batch; the batch is sent when `window`
+    seconds have passed or it holds `max_items` entities, whichever comes
+    first, and every caller gets its own result back. Callers wait no longer
+    than their own deadline; one that gives up does not take its entity out
+    of the batch.
+    """
+
+    def __init__(self, enabled: bool = CYODA_WRITE_BATCHING, window: float = CYODA_WRITE_BATCH_WINDOW,
+                 max_items: int = CYODA_WRITE_BATCH_MAX_ITEMS):
+        self.enabled = enabled
+        self.window = window
+        self.max_items = max_items
+        self._batches: Dict[Hashable, _Batch] = {}
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: Hashable, meta: Any, entity: Any, flush: Flush) -> Any:
+        """
+        Add the entity to the open batch for key and wait for its result.
+        flush(meta, entities) must return one result per entity, in order.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(meta, flush)
+            batch.timer = loop.call_later(self.window, self._send, key, batch)
+        future = loop.create_future()
+        batch.items.append(entity)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_items:
+            self._send(key, batch)
+        return await deadline.wait_shared(future, "a batched save")
+
+    def _send(self, key: Hashable, batch: _Batch) -> None:
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        batch.timer.cancel()
+        self.batches += 1
+        self.items += len(batch.items)
+        deadline.run_detached(self._flush(batch))
+
+    @staticmethod
+    async def _flush(batch: _Batch) -> None:
+        try:
+            results = await batch.flush(batch.meta, batch.items)
+            if len(results) != len(batch.items):
+                raise Exception(f"Expected {len(batch.items)} results from the batched save, got {len(results)}")
+            errors = [None] * len(results)
+        except BulkWriteException as e:
+            results = e.results
+            errors = [e if result is None else None for result in results]
+        except Exception as e:
+            results = [None] * len(batch.items)
+            errors = [e] * len(batch.items)
+        for future, result, error in zip(batch.futures, results, errors):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "open_batches": len(self._batches),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+        }
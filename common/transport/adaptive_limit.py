@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+from common.config.config import (
+    CYODA_ADAPTIVE_CONCURRENCY,
+    CYODA_ADAPTIVE_INITIAL_LIMIT,
+    CYODA_ADAPTIVE_MIN_LIMIT,
+    CYODA_ADAPTIVE_MAX_LIMIT,
+    CYODA_ADAPTIVE_BACKOFF_RATIO,
+    CYODA_ADAPTIVE_LATENCY_TOLERANCE,
+)
+from common.exception.exceptions import DeadlineExceededException
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+
+class Permit:
+    """
+    Handed to the caller for the duration of one call; set dropped=True when
+    the backend signalled overload (timeout, 429, 5xx).
+    """
+    __slots__ = ("dropped",)
+
+    def __init__(self):
+        self.dropped = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit, in the spirit of TCP congestion control.
+
+    While calls succeed with latency close to the no-load baseline for their
+    operation (see operation_key), the limit grows by roughly one per limit's
+    worth of calls (additive increase). A dropped call or a latency above
+    latency_tolerance x baseline multiplies the limit by backoff_ratio
+    (multiplicative decrease), at most once per baseline latency so a single
+    burst of failures is one signal. Calls whose latency depends on their size
+    (bulk writes, full scans) pass latency_signal=False: only their drops
+    count. Calls over the limit wait in FIFO order.
+    """
+
+    def __init__(self, enabled: bool = CYODA_ADAPTIVE_CONCURRENCY,
+                 initial_limit: int = CYODA_ADAPTIVE_INITIAL_LIMIT,
+                 min_limit: int = CYODA_ADAPTIVE_MIN_LIMIT,
+                 max_limit: int = CYODA_ADAPTIVE_MAX_LIMIT,
+                 backoff_ratio: float = CYODA_ADAPTIVE_BACKOFF_RATIO,
+                 latency_tolerance: float = CYODA_ADAPTIVE_LATENCY_TOLERANCE):
+        self.enabled = enabled
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(max(min_limit, min(max_limit, initial_limit)))
+        self.in_flight = 0
+        self.drops = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @staticmethod
+    def operation_key(method: str, path: str) -> str:
+        """
+        Method plus path with id-like segments (anything containing a digit)
+        wildcarded, e.g. "GET entity/*" or "PUT entity/JSON/*/update".
+        """
+        segments = path.split("?", 1)[0].strip("/").split("/")
+        return method.upper() + " " + "/".join(
+            "*" if any(c.isdigit() for c in segment) else segment for segment in segments
+        )
+
+    @asynccontextmanager
+    async def slot(self, key: str, latency_signal: bool = True):
+        if not self.enabled:
+            yield Permit()
+            return
+        await self._acquire()
+        permit = Permit()
+        started = time.monotonic()
+        completed = False
+        try:
+            yield permit
+            completed = True
+        finally:
+            self.in_flight -= 1
+            # Cancelled calls say nothing about the backend's health
+            if completed or permit.dropped:
+                self._on_sample(key, time.monotonic() - started, permit.dropped, latency_signal)
+            self._wake_waiters()
+
+    def has_free_slot(self) -> bool:
+        return not self.enabled or (self.in_flight < int(self.limit) and not self._waiters)
+
+    async def _acquire(self) -> None:
+        if self.has_free_slot():
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            time_left = deadline.remaining()
+            if time_left is None:
+                await waiter
+            else:
+                async with asyncio.timeout(max(0.0, time_left)):
+                    await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was already handed over to us; give it back
+                self.in_flight -= 1
+                self._wake_waiters()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                raise DeadlineExceededException("Deadline exceeded while waiting for a Cyoda concurrency slot")
+            raise
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _on_sample(self, key: str, latency: float, dropped: bool, latency_signal: bool = True) -> None:
+        baseline = self._baselines.get(key) if latency_signal else None
+        now = time.monotonic()
+        if dropped or (baseline is not None and latency > baseline * self.latency_tolerance):
+            if dropped:
+                self.drops += 1
+            if now - self._last_decrease >= (baseline or latency):
+                new_limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                if int(new_limit) != int(self.limit):
+                    logger.info(f"Cyoda concurrency limit decreased {int(self.limit)} -> {int(new_limit)}")
+                self.limit = new_limit
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        if latency_signal and not dropped:
+            # The baseline follows the no-load latency: it drops to any faster sample at once and
+            # creeps up only slowly, so load-induced latency is not mistaken for the new normal
+            if baseline is None or latency < baseline:
+                self._baselines[key] = latency
+            else:
+                self._baselines[key] = baseline + (latency - baseline) * 0.001
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "drops": self.drops,
+            "baseline_latency": dict(self._baselines),
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from common.config.config import (
+    CYODA_BULKHEAD_INTERACTIVE,
+    CYODA_BULKHEAD_BULK,
+    CYODA_BULKHEAD_PROCESSOR,
+)
+from common.exception.exceptions import DeadlineExceededException
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE_LANE = "interactive"
+BULK_LANE = "bulk"
+PROCESSOR_LANE = "processor"
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("cyoda_outbound_lane", default=INTERACTIVE_LANE)
+
+
+@contextmanager
+def outbound_lane(name: Optional[str]):
+    """
+    Route every outbound Cyoda call made inside the block through the named bulkhead.
+
+        with outbound_lane(BULK_LANE):
+            await entity_service.add_item(...)
+    """
+    if not name:
+        yield
+        return
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class Bulkhead:
+    """
+    Concurrency limit for one class of outbound traffic, with queue-time metrics.
+    """
+
+    def __init__(self, name: str, max_concurrent: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.queued = 0
+        self.calls = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    @asynccontextmanager
+    async def acquire(self):
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            await self._wait_for_slot()
+        finally:
+            self.queued -= 1
+        queue_time = time.monotonic() - started
+        self.calls += 1
+        self.total_queue_time += queue_time
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def has_free_slot(self) -> bool:
+        return not self._semaphore.locked()
+
+    async def _wait_for_slot(self) -> None:
+        time_left = deadline.remaining()
+        if time_left is None:
+            await self._semaphore.acquire()
+            return
+        try:
+            async with asyncio.timeout(max(0.0, time_left)):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            raise DeadlineExceededException(f"Deadline exceeded while queued in the '{self.name}' lane")
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queued": self.queued,
+            "calls": self.calls,
+            "avg_queue_time_ms": (self.total_queue_time / self.calls * 1000) if self.calls else 0.0,
+            "max_queue_time_ms": self.max_queue_time * 1000,
+        }
+
+
+class BulkheadRegistry:
+    """
+    Named bulkheads for outbound calls. Interactive route traffic, background
+    bulk jobs and gRPC processor side-calls each get their own lane, so one
+    kind of traffic cannot starve the others of connections.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        limits = limits or {
+            INTERACTIVE_LANE: CYODA_BULKHEAD_INTERACTIVE,
+            BULK_LANE: CYODA_BULKHEAD_BULK,
+            PROCESSOR_LANE: CYODA_BULKHEAD_PROCESSOR,
+        }
+        self._bulkheads: Dict[str, Bulkhead] = {name: Bulkhead(name, limit) for name, limit in limits.items()}
+
+    def get(self, name: Optional[str] = None) -> Bulkhead:
+        name = name or current_lane()
+        bulkhead = self._bulkheads.get(name)
+        if bulkhead is None:
+            logger.warning(f"Unknown outbound lane '{name}'; using '{INTERACTIVE_LANE}'")
+            bulkhead = self._bulkheads[INTERACTIVE_LANE]
+        return bulkhead
+
+    def stats(self) -> dict:
+        return {name: bulkhead.stats() for name, bulkhead in self._bulkheads.items()}
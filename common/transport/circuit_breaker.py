@@ -0,0 +1,99 @@
+import logging
+import time
+from typing import Dict
+
+from common.config.config import CYODA_BREAKER_FAILURE_THRESHOLD, CYODA_BREAKER_RECOVERY_TIMEOUT
+from common.exception.exceptions import CircuitOpenException
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenException. Once recovery_timeout has
+    elapsed a single probe call is let through (half-open): success closes the
+    circuit, failure opens it again for another recovery_timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CYODA_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = CYODA_BREAKER_RECOVERY_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenException if the call must not be attempted.
+        """
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self.recovery_timeout - (now - self._opened_at)
+            if retry_in > 0:
+                raise CircuitOpenException(f"Circuit '{self.name}' is open; retry in {retry_in:.1f}s")
+            self.state = HALF_OPEN
+            self._probe_started_at = now
+            logger.info(f"Circuit '{self.name}' half-open; sending a probe request")
+            return
+        # HALF_OPEN: one probe at a time, unless the previous one never reported back
+        if now - self._probe_started_at < self.recovery_timeout:
+            raise CircuitOpenException(f"Circuit '{self.name}' is half-open; waiting for the probe request")
+        self._probe_started_at = now
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.state = CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class CircuitBreakerRegistry:
+    """
+    One circuit breaker per endpoint class, i.e. the first segment of the API
+    path (entity, search, message, platform-api, ...), so a failing search
+    backend does not trip entity reads and writes.
+    """
+
+    def __init__(self, failure_threshold: int = CYODA_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = CYODA_BREAKER_RECOVERY_TIMEOUT):
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def endpoint_class(path: str) -> str:
+        return path.split("?", 1)[0].strip("/").split("/", 1)[0]
+
+    def for_path(self, path: str) -> CircuitBreaker:
+        name = self.endpoint_class(path)
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, self._failure_threshold, self._recovery_timeout)
+            self._breakers[name] = breaker
+        return breaker
+
+    def stats(self) -> dict:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
@@ -0,0 +1,67 @@
+import asyncio
+import gzip
+import logging
+from typing import Optional, Set, Tuple
+
+from common.config.config import CYODA_HTTP_REQUEST_COMPRESSION, CYODA_HTTP_COMPRESSION_MIN_BYTES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# Bodies at least this large are compressed on a worker thread, off the event loop
+_OFFLOAD_MIN_BYTES = 256 * 1024
+
+
+class BodyCompressor:
+    """
+    Compresses outbound request bodies above a size threshold and advertises
+    the response encodings the client can decode.
+
+    Request compression is opt-in because not every server accepts compressed
+    bodies. A host that answers 415 Unsupported Media Type is remembered and
+    gets uncompressed bodies from then on.
+    """
+
+    def __init__(self, encoding: str = CYODA_HTTP_REQUEST_COMPRESSION, min_size: int = CYODA_HTTP_COMPRESSION_MIN_BYTES):
+        encoding = (encoding or "none").lower()
+        if encoding == ZSTD and zstandard is None:
+            logger.warning("zstd request compression requested but 'zstandard' is not installed; using gzip")
+            encoding = GZIP
+        self.encoding: Optional[str] = encoding if encoding in (GZIP, ZSTD) else None
+        self.min_size = min_size
+        # httpx decodes gzip natively and zstd whenever zstandard is importable
+        self.accept_encoding = f"{ZSTD}, {GZIP}" if zstandard is not None else GZIP
+        self._unsupported_hosts: Set[str] = set()
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
+
+    async def compress(self, host: str, content) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Return (body, content_encoding). content_encoding is None when the body is sent as is.
+        """
+        if content is None or self.encoding is None or host in self._unsupported_hosts:
+            return content, None
+        body = content.encode("utf-8") if isinstance(content, str) else content
+        if len(body) < self.min_size:
+            return body, None
+        if len(body) < _OFFLOAD_MIN_BYTES:
+            return self._compress(body, self._zstd_compressor), self.encoding
+        # Both codecs release the GIL, so large bodies do not stall other requests
+        return await asyncio.to_thread(self._compress, body, None), self.encoding
+
+    def _compress(self, body: bytes, zstd_compressor=None) -> bytes:
+        if self.encoding == ZSTD:
+            # A ZstdCompressor must not be used by two threads at once, so worker threads get their own
+            return (zstd_compressor or zstandard.ZstdCompressor(level=3)).compress(body)
+        return gzip.compress(body, compresslevel=5)
+
+    def mark_unsupported(self, host: str) -> None:
+        if host not in self._unsupported_hosts:
+            logger.warning(f"{host} rejected a compressed request body; sending uncompressed bodies from now on")
+            self._unsupported_hosts.add(host)
@@ -0,0 +1,94 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Coroutine, Optional, Set
+
+from common.exception.exceptions import DeadlineExceededException
+
+# Absolute time.monotonic() value by which the current unit of work must finish
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("cyoda_deadline", default=None)
+
+# Background tasks started by run_detached, referenced until they finish
+_detached: Set[asyncio.Task] = set()
+
+
+def set_deadline(seconds: float) -> None:
+    """
+    Give the current task a deadline. Used per incoming request, where the
+    whole task belongs to that request, so nothing needs to be reset.
+    """
+    _deadline.set(time.monotonic() + seconds)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    Run the block under a deadline, never extending an enclosing one.
+    """
+    candidate = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline, or None when there is no deadline.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def remaining_within(timeout: float) -> float:
+    """
+    The given timeout, shortened to the time left before the current deadline.
+    """
+    left = remaining()
+    return timeout if left is None else max(0.0, min(timeout, left))
+
+
+def allows(delay: float) -> bool:
+    """
+    Whether waiting `delay` seconds still leaves time before the deadline.
+    """
+    left = remaining()
+    return left is None or left > delay
+
+
+def check_deadline() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededException()
+
+
+def run_detached(coro: Coroutine) -> asyncio.Task:
+    """
+    Run coro as a background task in a fresh context, so it neither inherits
+    nor is cut short by the deadline (or outbound lane) of whichever caller
+    started it. The task is kept referenced until it finishes.
+    """
+    task = asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+    _detached.add(task)
+    task.add_done_callback(_detached.discard)
+    return task
+
+
+async def wait_shared(future: asyncio.Future, what: str) -> Any:
+    """
+    Wait for a result shared with other callers, no longer than the current
+    deadline. Giving up leaves the shared work running for the others.
+    """
+    time_left = remaining()
+    if time_left is None:
+        return await asyncio.shield(future)
+    try:
+        async with asyncio.timeout(max(0.0, time_left)) as scope:
+            return await asyncio.shield(future)
+    except TimeoutError:
+        if scope.expired():
+            raise DeadlineExceededException(f"Deadline exceeded while waiting for {what}")
+        raise
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from common.config.config import (
+    CYODA_HEDGE_PERCENTILE,
+    CYODA_HEDGE_MIN_DELAY,
+    CYODA_HEDGE_BUDGET_RATIO,
+)
+from common.transport.retry import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+# Below this many samples the latency percentile is meaningless, so no hedging
+_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if len(self._samples) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Hedged requests for idempotent reads.
+
+    If the first attempt has not answered within the configured latency
+    percentile of recent calls with the same key, a second attempt is fired and
+    whichever succeeds first wins; the other is cancelled. No hedge is fired
+    while can_hedge() says there is no free capacity for it. Hedges are paid for
+    from a budget that earns budget_ratio tokens per call, and the ratio is
+    capped at 1.0, so hedging can never more than double the load.
+    """
+
+    def __init__(self, percentile: float = CYODA_HEDGE_PERCENTILE, min_delay: float = CYODA_HEDGE_MIN_DELAY,
+                 budget_ratio: float = CYODA_HEDGE_BUDGET_RATIO):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        ratio = min(1.0, budget_ratio)
+        self._budget = RetryBudget(ratio=ratio, min_per_second=0.0, max_tokens=max(1.0, ratio * 100))
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedges_skipped = 0
+        self.hedge_wins = 0
+
+    def _tracker(self, key: str) -> LatencyTracker:
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = LatencyTracker()
+        return tracker
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        delay = self._tracker(key).percentile(self.percentile)
+        return None if delay is None else max(self.min_delay, delay)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]],
+                  can_hedge: Optional[Callable[[], bool]] = None) -> Any:
+        self.calls += 1
+        self._budget.record_request()
+        tracker = self._tracker(key)
+        delay = self.hedge_delay(key)
+
+        started = time.monotonic()
+        first = asyncio.ensure_future(fn())
+        attempts = {first: started}
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if not done and can_hedge is not None and not can_hedge():
+                self.hedges_skipped += 1
+            elif not done and self._budget.try_spend():
+                self.hedges += 1
+                attempts[asyncio.ensure_future(fn())] = time.monotonic()
+
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                # A failed attempt only decides the outcome once no other attempt is left
+                if succeeded or not pending:
+                    winner = succeeded[0] if succeeded else done.pop()
+                    tracker.record(time.monotonic() - attempts[winner])
+                    if winner is not first:
+                        self.hedge_wins += 1
+                    return winner.result()
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedges_skipped": self.hedges_skipped,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delays": {key: self.hedge_delay(key) for key in self._trackers},
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from common.config.config import (
+    CYODA_HTTP_TIMEOUT,
+    CYODA_HTTP_MAX_CONNECTIONS,
+    CYODA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    CYODA_HTTP_KEEPALIVE_EXPIRY,
+    CYODA_HTTP_MAX_CONNECTIONS_PER_HOST,
+    CYODA_HTTP2,
+)
+from common.exception.exceptions import DeadlineExceededException
+from common.transport import deadline
+from common.transport.compression import BodyCompressor
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+        return False
+    return True
+
+
+class PooledHttpClient:
+    """
+    Long-lived httpx.AsyncClient shared by all outbound Cyoda REST calls.
+    Connections are kept alive between requests, so callers only pay the
+    TCP + TLS handshake when the pool has to open a new connection.
+
+    With http2=True, concurrent requests to the same host are multiplexed as
+    streams over a few connections. The protocol is negotiated per connection
+    through ALPN, so servers that only speak HTTP/1.1 keep working unchanged.
+    Set http1=False to speak HTTP/2 with prior knowledge (h2c) to a
+    cleartext endpoint.
+
+    Responses are requested gzip/zstd encoded; large request bodies are
+    compressed according to the supplied BodyCompressor.
+    """
+
+    def __init__(
+            self,
+            timeout: float = CYODA_HTTP_TIMEOUT,
+            max_connections: int = CYODA_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections: int = CYODA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry: float = CYODA_HTTP_KEEPALIVE_EXPIRY,
+            max_connections_per_host: int = CYODA_HTTP_MAX_CONNECTIONS_PER_HOST,
+            http2: bool = CYODA_HTTP2,
+            http1: bool = True,
+            compressor: Optional[BodyCompressor] = None,
+    ):
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._max_connections_per_host = max_connections_per_host
+        self._http2 = http2 and _http2_available()
+        self._http1 = http1 or not self._http2
+        self._compressor = compressor or BodyCompressor()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self) -> None:
+        """
+        Open the pool. Called from the Quart before_serving hook.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+            logger.info(
+                f"HTTP connection pool started (max_connections={self._limits.max_connections}, "
+                f"max_keepalive={self._limits.max_keepalive_connections}, "
+                f"keepalive_expiry={self._limits.keepalive_expiry}s, "
+                f"per_host={self._max_connections_per_host}, http2={self._http2})"
+            )
+
+    async def close(self) -> None:
+        """
+        Close every pooled connection. Called from the Quart after_serving hook.
+        """
+        client, self._client = self._client, None
+        self._host_semaphores.clear()
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("HTTP connection pool closed")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so scripts that never run the Quart lifecycle still work
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self._timeout,
+            limits=self._limits,
+            http1=self._http1,
+            http2=self._http2,
+        )
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, headers=None, content=None, json=None) -> httpx.Response:
+        """
+        Send a request, bounded by the deadline of the current request context if there is one.
+        """
+        time_left = deadline.remaining()
+        if time_left is None:
+            return await self._request(method, url, headers, content, json)
+        if time_left <= 0:
+            raise DeadlineExceededException(f"Deadline exceeded before {method} {url}")
+        try:
+            async with asyncio.timeout(time_left):
+                return await self._request(method, url, headers, content, json)
+        except TimeoutError:
+            raise DeadlineExceededException(f"Deadline exceeded during {method} {url}")
+
+    async def _request(self, method: str, url: str, headers, content, json) -> httpx.Response:
+        host = urlsplit(url).netloc
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", self._compressor.accept_encoding)
+        body, content_encoding = await self._compressor.compress(host, content)
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+
+        async with self._host_semaphore(host):
+            response = await self.client.request(method, url, headers=headers, content=body, json=json)
+            if content_encoding and response.status_code == 415:
+                self._compressor.mark_unsupported(host)
+                del headers["Content-Encoding"]
+                response = await self.client.request(method, url, headers=headers, content=content, json=json)
+            return response
+
+
+http_client = PooledHttpClient()
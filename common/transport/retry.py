@@ -0,0 +1,86 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from common.config.config import (
+    CYODA_RETRY_BASE_DELAY,
+    CYODA_RETRY_MAX_DELAY,
+    CYODA_RETRY_BUDGET_RATIO,
+    CYODA_RETRY_BUDGET_MIN_PER_SECOND,
+)
+
+
+class RetryBudget:
+    """
+    Global cap on retries, shared by every outbound request.
+
+    Each request deposits `ratio` tokens and each retry spends one, so retries
+    can add at most `ratio` extra load on top of normal traffic. A trickle of
+    `min_per_second` tokens keeps retries possible when traffic is low.
+    """
+
+    def __init__(self, ratio: float = CYODA_RETRY_BUDGET_RATIO,
+                 min_per_second: float = CYODA_RETRY_BUDGET_MIN_PER_SECOND,
+                 max_tokens: Optional[float] = None):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens if max_tokens is not None else max(10.0, min_per_second * 10)
+        self._tokens = self.max_tokens
+        self._updated_at = time.monotonic()
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated_at) * self.min_per_second)
+        self._updated_at = now
+
+    def record_request(self) -> None:
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"tokens": round(self._tokens, 2), "retries": self.retries, "rejected": self.rejected}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None,
+                  base_delay: float = CYODA_RETRY_BASE_DELAY, max_delay: float = CYODA_RETRY_MAX_DELAY) -> float:
+    """
+    Full-jitter exponential backoff. A server supplied Retry-After is honoured
+    (capped at max_delay) with a little jitter so waiting callers do not all
+    come back at the same instant.
+    """
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is not None:
+        return min(max_delay, server_delay) + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
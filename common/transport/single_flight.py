@@ -0,0 +1,86 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from common.exception.exceptions import DeadlineExceededException
+from common.transport import deadline
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    The first caller for a key runs the call; callers arriving while it is still
+    in flight wait for the same result instead of issuing their own. The first
+    caller keeps the original result; when others joined, they share one deep
+    copy taken at completion, each but the last taking a copy of its own, so
+    mutating a result never leaks into another caller. A call nobody joined
+    is never copied.
+
+    The call runs under the first caller's deadline. A joined caller waits no
+    longer than its own deadline, and when the first caller's deadline cut
+    the call short it runs the call again under its own.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            flight.waiters += 1
+            try:
+                result = await deadline.wait_shared(flight.future, "a shared call")
+            except asyncio.CancelledError:
+                # The leading call was cancelled, not us: run the call ourselves
+                if flight.future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.do(key, fn)
+                raise
+            except DeadlineExceededException:
+                # The leading caller's deadline is not ours
+                if flight.future.done() and deadline.allows(0.0):
+                    return await self.do(key, fn)
+                raise
+            finally:
+                flight.waiters -= 1
+            # The last waiter to resume may keep the shared copy
+            return result if flight.waiters == 0 else copy.deepcopy(result)
+
+        flight = self._in_flight[key] = _Flight(asyncio.get_running_loop().create_future())
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except BaseException as e:
+            flight.future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            flight.future.exception()
+            raise
+        else:
+            flight.future.set_result(copy.deepcopy(result) if flight.waiters else result)
+        finally:
+            self._in_flight.pop(key, None)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,128 @@
+"""
+JSON codec shared by the transport, the repositories and the gRPC client.
+
+Uses orjson when it is installed (and CYODA_JSON_CODEC is "auto" or "orjson"),
+otherwise the stdlib json module. orjson output is compact UTF-8 where the
+stdlib escapes non-ASCII characters; both decode to the same data.
+
+Values orjson would encode natively are encoded the same way on both
+backends, before anything reaches the caller's default: datetime, date and
+time as ISO 8601 strings, UUIDs as their canonical string, Enums as their
+value and dataclass instances as an object of their fields.
+
+Whatever orjson refuses is handed to the stdlib, which then either succeeds
+or raises its usual error:
+
+- integers wider than 64 bits when encoding,
+- non-standard NaN/Infinity tokens when decoding,
+- unserializable objects, circular references and very deep nesting.
+
+Two edge cases still differ between the backends and are accepted:
+
+- NaN/Infinity floats encode as null under orjson but as the invalid NaN /
+  Infinity tokens under the stdlib;
+- integer literals outside the 64-bit range decode to floats under orjson.
+  Cyoda's entity numbers are Java longs, so this never occurs in responses
+  from the platform.
+"""
+import dataclasses
+import datetime
+import enum
+import json
+import logging
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from common.config.config import CYODA_JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None and CYODA_JSON_CODEC.lower() in ("auto", "orjson"):
+    BACKEND = "orjson"
+elif CYODA_JSON_CODEC.lower() == "orjson":
+    logger.warning("CYODA_JSON_CODEC=orjson but orjson is not installed; using the stdlib json module")
+    BACKEND = "json"
+else:
+    BACKEND = "json"
+
+
+def _encode_builtin(obj: Any) -> Any:
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=64)
+def _shared_default(default: Optional[Callable]) -> Callable[[Any], Any]:
+    """
+    The default both backends use: the types in the module docstring first,
+    then the caller's default for anything else.
+    """
+    if default is None:
+        return _encode_builtin
+
+    def encode(obj: Any) -> Any:
+        try:
+            return _encode_builtin(obj)
+        except TypeError:
+            return default(obj)
+    return encode
+
+
+def _stdlib_dumps(obj: Any, default: Optional[Callable] = None) -> str:
+    return json.dumps(obj, default=_shared_default(default))
+
+
+def _stdlib_dumps_bytes(obj: Any, default: Optional[Callable] = None) -> bytes:
+    return _stdlib_dumps(obj, default=default).encode("utf-8")
+
+
+# datetime and dataclass values go through _shared_default, as on the stdlib backend
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+
+def _orjson_dumps_bytes(obj: Any, default: Optional[Callable] = None) -> bytes:
+    try:
+        return orjson.dumps(obj, default=_shared_default(default), option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # Wide integers, deep nesting or unserializable objects: let the stdlib decide
+        return _stdlib_dumps_bytes(obj, default=default)
+
+
+def _orjson_loads(data) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # NaN/Infinity tokens are accepted by the stdlib; genuine errors are re-raised there
+        return json.loads(data)
+
+
+def _orjson_dumps(obj: Any, default: Optional[Callable] = None) -> str:
+    return _orjson_dumps_bytes(obj, default=default).decode("utf-8")
+
+
+if BACKEND == "orjson":
+    dumps = _orjson_dumps
+    dumps_bytes = _orjson_dumps_bytes
+    loads = _orjson_loads
+else:
+    dumps = _stdlib_dumps
+    dumps_bytes = _stdlib_dumps_bytes
+    loads = json.loads
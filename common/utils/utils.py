@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import queue
 import time
@@ -13,10 +14,51 @@ import jsonschema
 from jsonschema import validate
 
 from common.auth.cyoda_auth import CyodaAuthService
-from common.config.config import CYODA_API_URL
+from common.config.config import CYODA_API_URL, CYODA_COALESCE_GETS, CYODA_MAX_RETRIES, CYODA_HEDGING
+from common.transport.bulkhead import BULK_LANE, Bulkhead, BulkheadRegistry
+from common.transport import deadline
+from common.transport.adaptive_limit import AdaptiveConcurrencyLimiter
+from common.transport.circuit_breaker import CircuitBreakerRegistry
+from common.transport.hedging import Hedger
+from common.transport.http_client import http_client
+from common.transport.retry import RetryBudget, backoff_delay
+from common.transport.single_flight import SingleFlight
+from common.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("get", "delete")
+
+# Coalesces identical in-flight Cyoda GETs; stats() reports how many calls were saved
+cyoda_get_flights = SingleFlight()
+# Per-endpoint-class circuit breakers and the retry budget shared by all Cyoda calls
+cyoda_circuit_breakers = CircuitBreakerRegistry()
+cyoda_retry_budget = RetryBudget()
+# Outbound concurrency lanes (interactive, bulk, processor); stats() reports queue times
+cyoda_bulkheads = BulkheadRegistry()
+# Hedging of idempotent reads, per endpoint class latency
+cyoda_hedger = Hedger()
+# AIMD limit on in-flight Cyoda calls; stats() reports the current limit and queue depth
+cyoda_concurrency_limiter = AdaptiveConcurrencyLimiter()
+
+
+def cyoda_transport_stats() -> dict:
+    """
+    State of every outbound Cyoda safeguard in one place: breaker states,
+    retry budget, lane saturation, the adaptive limit, hedging and GET
+    coalescing. Served by the /metrics endpoint.
+    """
+    return {
+        "circuit_breakers": cyoda_circuit_breakers.stats(),
+        "retry_budget": cyoda_retry_budget.stats(),
+        "bulkheads": cyoda_bulkheads.stats(),
+        "concurrency_limit": cyoda_concurrency_limiter.stats(),
+        "hedging": cyoda_hedger.stats(),
+        "get_coalescing": cyoda_get_flights.stats(),
+    }
+
+
 class ValidationErrorException(Exception):
     """Custom exception for validation errors."""
     def __init__(self, message: str):
@@ -426,36 +468,39 @@ async def send_get_request(token: str, api_url: str, path: str) -> Optional[Any]
         raise
 
 
+def _decode_content(response):
+    if 'application/json' in response.headers.get('Content-Type', ''):
+        return json_codec.loads(response.content)
+    return response.text
+
+
 async def send_request(headers, url, method, data=None, json=None):
-    async with httpx.AsyncClient(timeout=150.0) as client:
-        method = method.upper()
-        if method == 'GET':
-            response = await client.get(url, headers=headers)
-            # Only process GET responses with status 200 or 404 as in your original code
-            if response.status_code in (200, 404):
-                content = response.json() if 'application/json' in response.headers.get('Content-Type',
-                                                                                        '') else response.text
-            else:
-                content = None
-        elif method == 'POST':
-            response = await client.post(url, headers=headers, data=data, json=json)
-            content = response.json() if 'application/json' in response.headers.get('Content-Type',
-                                                                                    '') else response.text
-        elif method == 'PUT':
-            response = await client.put(url, headers=headers, data=data, json=json)
-            content = response.json() if 'application/json' in response.headers.get('Content-Type',
-                                                                                    '') else response.text
-        elif method == 'DELETE':
-            response = await client.delete(url, headers=headers)
-            content = response.json() if 'application/json' in response.headers.get('Content-Type',
-                                                                                    '') else response.text
+    method = method.upper()
+    if method == 'GET':
+        response = await http_client.request(method, url, headers=headers)
+        # Only process GET responses with status 200 or 404 as in your original code
+        if response.status_code in (200, 404):
+            content = _decode_content(response)
         else:
-            raise ValueError("Unsupported HTTP method")
+            content = None
+    elif method in ('POST', 'PUT'):
+        if json is not None:
+            data, json = json_codec.dumps_bytes(json), None
+        response = await http_client.request(method, url, headers=headers, content=data)
+        content = _decode_content(response)
+    elif method == 'DELETE':
+        response = await http_client.request(method, url, headers=headers)
+        content = _decode_content(response)
+    else:
+        raise ValueError("Unsupported HTTP method")
 
-        return {
-            "status": response.status_code,
-            "json": content
-        }
+    result = {
+        "status": response.status_code,
+        "json": content
+    }
+    if "Retry-After" in response.headers:
+        result["retry_after"] = response.headers["Retry-After"]
+    return result
 
 
 async def send_post_request(token: str, api_url: str, path: str, data=None, json=None) -> Optional[Any]:
@@ -543,41 +588,153 @@ async def send_cyoda_request(
         method: str,
         path: str,
         data: Any = None,
-        base_url: str = CYODA_API_URL
+        base_url: str = CYODA_API_URL,
+        lane: Optional[str] = None,
+        hedge: bool = False
 ) -> dict:
     """
-    Send an HTTP request to the Cyoda API with automatic retry on 401.
+    Send an HTTP request to the Cyoda API with automatic retry on 401 and
+    on transient failures (see _send_cyoda_request).
+    Identical GETs already in flight for the same token share one upstream call.
+    The call runs in the given bulkhead lane, or the lane selected with outbound_lane().
+    hedge=True marks an idempotent read that may be hedged when CYODA_HEDGING is enabled.
     """
     token = await cyoda_auth_service.get_access_token()
-    for attempt in range(2):
+    if CYODA_COALESCE_GETS and method.lower() == "get":
+        key = ("GET", base_url, path, token)
+        return await cyoda_get_flights.do(
+            key,
+            lambda: _send_cyoda_request(cyoda_auth_service, method, path, data, base_url, token, lane, hedge)
+        )
+    return await _send_cyoda_request(cyoda_auth_service, method, path, data, base_url, token, lane, hedge)
+
+
+async def _send_cyoda_request(
+        cyoda_auth_service: CyodaAuthService,
+        method: str,
+        path: str,
+        data: Any,
+        base_url: str,
+        token: str,
+        lane: Optional[str] = None,
+        hedge: bool = False
+) -> dict:
+    """
+    Retries once on 401 with fresh tokens, and retries 429/502/503/504 and
+    connection failures with jittered backoff while the global retry budget
+    allows. Each endpoint class has a circuit breaker that fails calls fast
+    while the backend is known to be down, and every attempt, hedges included,
+    holds a slot of its bulkhead lane and of the adaptive concurrency limit.
+    """
+    breaker = cyoda_circuit_breakers.for_path(path)
+    bulkhead = cyoda_bulkheads.get(lane)
+    operation = cyoda_concurrency_limiter.operation_key(method, path)
+    # Bulk-lane calls are slow by nature (chunked writes, scans), so only their failures say anything
+    latency_signal = bulkhead.name != BULK_LANE
+    hedged = hedge and CYODA_HEDGING and method.lower() == "get"
+    cyoda_retry_budget.record_request()
+    auth_retried = False
+    attempt = 0
+    while True:
+        breaker.before_call()
         try:
-            if method.lower() == "get":
-                resp = await send_get_request(token, base_url, path)
-            elif method.lower() == "post":
-                resp = await send_post_request(token, base_url, path, data=data)
-            elif method.lower() == "put":
-                resp = await send_put_request(token, base_url, path, data=data)
-            elif method.lower() == "delete":
-                resp = await send_delete_request(token, base_url, path)
+            if hedged:
+                # A hedge is only worth it when it need not queue behind the calls it is racing
+                resp = await cyoda_hedger.run(
+                    breaker.name,
+                    lambda: _attempt_cyoda_request(bulkhead, operation, latency_signal, method, token, base_url,
+                                                   path, data),
+                    lambda: bulkhead.has_free_slot() and cyoda_concurrency_limiter.has_free_slot()
+                )
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            # todo check here
+                resp = await _attempt_cyoda_request(bulkhead, operation, latency_signal, method, token, base_url,
+                                                    path, data)
         except Exception as exc:
             msg = str(exc)
-            if attempt == 0 and ("401" in msg or "Unauthorized" in msg):
+            if not auth_retried and ("401" in msg or "Unauthorized" in msg):
                 logger.warning(f"Request to {path} failed with 401; invalidating tokens and retrying")
                 _invalidate_tokens(cyoda_auth_service=cyoda_auth_service)
                 token = await cyoda_auth_service.get_access_token()
+                auth_retried = True
                 continue
-            raise
+            if isinstance(exc, httpx.TransportError):
+                # The backend did not answer, whether or not this call may be sent again
+                breaker.record_failure()
+            if not _is_retryable_error(exc, method):
+                raise
+            delay = backoff_delay(attempt)
+            if not _can_retry(attempt, delay):
+                raise
+            logger.warning(f"{method.upper()} {path} failed with {exc!r}; retrying in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+
         status = resp.get("status") if isinstance(resp, dict) else None
-        if attempt == 0 and status == 401:
+        if not auth_retried and status == 401:
             logger.warning(f"Response from {path} returned status 401; invalidating tokens and retrying")
             _invalidate_tokens(cyoda_auth_service=cyoda_auth_service)
             token = await cyoda_auth_service.get_access_token()
+            auth_retried = True
+            continue
+        if status is not None and status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if status in RETRYABLE_STATUSES and _is_retryable_status(status, method):
+            delay = backoff_delay(attempt, resp.get("retry_after"))
+            if not _can_retry(attempt, delay):
+                return resp
+            logger.warning(f"{method.upper()} {path} returned {status}; retrying in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
             continue
         return resp
-    raise RuntimeError(f"Failed request {method.upper()} {path} after retry")
+
+
+async def _attempt_cyoda_request(bulkhead: Bulkhead, operation: str, latency_signal: bool, method: str, token: str,
+                                 base_url: str, path: str, data: Any) -> dict:
+    async with bulkhead.acquire(), cyoda_concurrency_limiter.slot(operation, latency_signal) as permit:
+        try:
+            resp = await _dispatch_cyoda_request(method, token, base_url, path, data)
+        except (httpx.TimeoutException, httpx.NetworkError):
+            permit.dropped = True
+            raise
+        permit.dropped = _is_overload_status(resp.get("status") if isinstance(resp, dict) else None)
+        return resp
+
+
+async def _dispatch_cyoda_request(method: str, token: str, base_url: str, path: str, data: Any) -> dict:
+    if method.lower() == "get":
+        return await send_get_request(token, base_url, path)
+    elif method.lower() == "post":
+        return await send_post_request(token, base_url, path, data=data)
+    elif method.lower() == "put":
+        return await send_put_request(token, base_url, path, data=data)
+    elif method.lower() == "delete":
+        return await send_delete_request(token, base_url, path)
+    raise ValueError(f"Unsupported HTTP method: {method}")
+
+
+def _can_retry(attempt: int, delay: float) -> bool:
+    # Never sleep past the caller's deadline
+    return attempt < CYODA_MAX_RETRIES and deadline.allows(delay) and cyoda_retry_budget.try_spend()
+
+
+def _is_overload_status(status: Optional[int]) -> bool:
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _is_retryable_status(status: int, method: str) -> bool:
+    # 429 and 503 mean the request was refused, so even non-idempotent calls can be resent
+    return method.lower() in IDEMPOTENT_METHODS or status in (429, 503)
+
+
+def _is_retryable_error(exc: Exception, method: str) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        # The request never reached the server
+        return True
+    return method.lower() in IDEMPOTENT_METHODS and isinstance(exc, httpx.TransportError)
 
 def custom_serializer(obj):
     if isinstance(obj, queue.Queue):
@@ -45,6 +45,7 @@ default_externalized_processor_defaults = {
     # Only add these keys if missing in the processor
     "calculation_nodes_tags": "CHAT_ID_VAR",
     "attach_entity": True,
+    # Keep in line with GRPC_CALC_RESPONSE_TIMEOUT_MS, after which processors are cancelled
     "calculation_response_timeout_ms": "120000",
     "retry_policy": "NONE",
     "sync_process": False,
@@ -0,0 +1,84 @@
+"""
+Both JSON backends must encode the same payload to the same data.
+
+    python -m pytest tests/test_json_codec.py
+"""
+import dataclasses
+import datetime
+import enum
+import math
+import os
+import uuid
+
+import pytest
+
+# The codec reads its backend from common.config, which requires these
+os.environ.setdefault("CYODA_HOST", "localhost")
+os.environ.setdefault("CYODA_CLIENT_ID", "test")
+os.environ.setdefault("CYODA_CLIENT_SECRET", "test")
+os.environ.setdefault("CHAT_ID", "test")
+os.environ.setdefault("ENTITY_VERSION", "1")
+
+from common.utils import json_codec  # noqa: E402
+from common.utils.utils import custom_serializer  # noqa: E402
+
+requires_orjson = pytest.mark.skipif(json_codec.orjson is None, reason="orjson is not installed")
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Level(enum.IntEnum):
+    HIGH = 3
+
+
+@dataclasses.dataclass
+class Job:
+    name: str
+    due: datetime.date
+
+
+class Plain:
+    def __init__(self):
+        self.value = 1
+
+
+PAYLOADS = {
+    "aware datetime": datetime.datetime(2024, 1, 2, 3, 4, 5, 123, tzinfo=datetime.timezone.utc),
+    "naive datetime": datetime.datetime(2024, 1, 2, 3, 4, 5),
+    "date": datetime.date(2024, 1, 2),
+    "time": datetime.time(1, 2, 3),
+    "uuid": uuid.UUID("ee965a32-4df6-11b2-b48d-f20bdf753a91"),
+    "enum": Color.RED,
+    "int enum": Level.HIGH,
+    "dataclass": Job("import", datetime.date(2024, 1, 2)),
+    "plain object": Plain(),
+    "nested": {"ids": [uuid.UUID(int=1)], "at": datetime.date(2024, 1, 2), "text": "café", "n": [1, 2.5, None]},
+}
+
+
+@requires_orjson
+@pytest.mark.parametrize("name", PAYLOADS)
+def test_backends_encode_the_same_data(name):
+    payload = {"value": PAYLOADS[name]}
+    stdlib = json_codec._stdlib_dumps_bytes(payload, default=custom_serializer)
+    orjson = json_codec._orjson_dumps_bytes(payload, default=custom_serializer)
+    assert json_codec.loads(stdlib) == json_codec.loads(orjson)
+
+
+@pytest.mark.parametrize("name", ["aware datetime", "uuid", "enum", "dataclass"])
+def test_stdlib_encodes_orjson_native_types(name):
+    # Without the shared default these raised AttributeError through custom_serializer
+    json_codec._stdlib_dumps_bytes({"value": PAYLOADS[name]}, default=custom_serializer)
+
+
+@requires_orjson
+def test_non_finite_floats_differ_as_documented():
+    assert json_codec._orjson_dumps_bytes(math.nan) == b"null"
+    assert json_codec._stdlib_dumps_bytes(math.nan) == b"NaN"
+
+
+@requires_orjson
+def test_orjson_falls_back_to_stdlib_for_wide_integers():
+    assert json_codec._orjson_dumps_bytes(2 ** 70) == json_codec._stdlib_dumps_bytes(2 ** 70)